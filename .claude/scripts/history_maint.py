@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""~/.claude 运行时历史维护，供 sync-config.sh history 调用。
+
+history.jsonl 只会追加、不能删除，长期使用后加载和搜索都很慢。本工具：
+- compact：逐行流式读取（常量内存），去除重复记录，把超过保留期的记录
+  按月轮转到 history/history-YYYY-MM.jsonl.gz，并更新按项目的块偏移索引
+- query：按项目 / 日期范围查询，通过索引直接定位到相关的压缩块
+- bench：在生成的多 GB 历史文件上测试吞吐和内存
+
+压缩段由独立的 gzip 成员（块）拼接而成，每块约 1 MB 原始数据，
+索引记录每块的偏移、长度、时间范围和包含的项目，因此查询只需解压命中的块。
+
+用法：
+    history_maint.py compact [--keep-days 30]
+    history_maint.py query [--project 路径] [--since 2025-01-01] [--until 2025-02-01]
+    history_maint.py bench [--size-mb 2048]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_CLAUDE_DIR = Path.home() / ".claude"
+HISTORY_FILE = "history.jsonl"
+ARCHIVE_DIR = "history"
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+
+DEFAULT_KEEP_DAYS = 30
+BLOCK_BYTES = 1024 * 1024
+COMPRESS_LEVEL = 3
+# 去重窗口：只在最近的 N 条记录内查重，保证内存占用恒定（重复记录通常相邻出现）
+DEDUPE_WINDOW = 100_000
+READ_BUFFER = 1024 * 1024
+
+# Claude Code 写入的字段顺序为 display, pastedContents, timestamp, project，先尝试一次匹配两个字段
+RECORD_RE = re.compile(rb'"timestamp"\s*:\s*(\d+)\s*,\s*"project"\s*:\s*"((?:\\.|[^"\\])*)"')
+TIMESTAMP_RE = re.compile(rb'"timestamp"\s*:\s*(\d+)')
+PROJECT_RE = re.compile(rb'"project"\s*:\s*"((?:\\.|[^"\\])*)"')
+
+
+def parse_record(line: bytes) -> tuple[int | None, str]:
+    """提取时间戳（毫秒）和项目路径；先用正则快速提取，失败时回退到 JSON 解析。"""
+    match = RECORD_RE.search(line)
+    if match:
+        ts_match = project_match = match
+        project = match.group(2)
+    else:
+        ts_match = TIMESTAMP_RE.search(line)
+        project_match = PROJECT_RE.search(line)
+        project = project_match.group(1) if project_match else b""
+    if ts_match and project_match:
+        if b"\\" in project:
+            project = json.loads(b'"' + project + b'"').encode("utf-8")
+        return int(ts_match.group(1)), project.decode("utf-8", errors="replace")
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None, ""
+    if not isinstance(record, dict):
+        return None, ""
+    ts = record.get("timestamp")
+    return (int(ts) if isinstance(ts, (int, float)) else None), str(record.get("project", ""))
+
+
+def month_range(ts: int) -> tuple[int, int, str]:
+    """返回时间戳所在月份的 [起, 止) 毫秒范围和压缩段文件名（UTC）。"""
+    day = datetime.fromtimestamp(ts / 1000, tz=timezone.utc)
+    start = day.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000), f"history-{start:%Y-%m}.jsonl.gz"
+
+
+def load_index(archive: Path) -> dict:
+    try:
+        with open(archive / INDEX_FILE, encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "segments": {}, "projects": {}}
+
+
+def save_index(archive: Path, index: dict) -> None:
+    tmp = archive / f"{INDEX_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, archive / INDEX_FILE)
+
+
+class SegmentWriter:
+    """向按月压缩段追加 gzip 块，并把块信息登记到索引。"""
+
+    def __init__(self, archive: Path, name: str, index: dict):
+        self.name = name
+        self.index = index
+        self.file = open(archive / name, "ab")
+        self.blocks = index["segments"].setdefault(name, [])
+        self.buffer: list[bytes] = []
+        self.size = 0
+        self.min_ts = self.max_ts = 0
+        self.projects: set[str] = set()
+
+    def add(self, line: bytes, ts: int, project: str) -> None:
+        if not self.buffer:
+            self.min_ts = self.max_ts = ts
+        elif ts < self.min_ts:
+            self.min_ts = ts
+        elif ts > self.max_ts:
+            self.max_ts = ts
+        self.buffer.append(line)
+        self.size += len(line)
+        self.projects.add(project)
+        if self.size >= BLOCK_BYTES:
+            self.flush()
+
+    def flush(self) -> int:
+        """写出缓冲区为一个 gzip 成员，返回压缩后字节数。"""
+        if not self.buffer:
+            return 0
+        data = gzip.compress(b"".join(self.buffer), compresslevel=COMPRESS_LEVEL)
+        offset = self.file.seek(0, os.SEEK_END)
+        self.file.write(data)
+        block_id = len(self.blocks)
+        self.blocks.append([offset, len(data), self.min_ts, self.max_ts])
+        for project in self.projects:
+            self.index["projects"].setdefault(project, []).append([self.name, block_id])
+        self.buffer, self.size, self.projects = [], 0, set()
+        return len(data)
+
+    def close(self) -> int:
+        written = self.flush()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        return written
+
+
+def read_lines(f: BinaryIO, limit: int) -> Iterator[tuple[bytes, int]]:
+    """逐行读取到 limit 字节为止，产出 (行, 行尾偏移)；末尾不完整的行不产出。"""
+    offset = 0
+    for line in f:
+        if offset + len(line) > limit or not line.endswith(b"\n"):
+            break
+        offset += len(line)
+        yield line, offset
+
+
+def _copy_from(src: BinaryIO, offset: int, dst: BinaryIO) -> int:
+    """把 src 从 offset 到当前末尾的内容追加到 dst，返回新的末尾偏移。"""
+    src.seek(offset)
+    shutil.copyfileobj(src, dst, READ_BUFFER)
+    return src.tell()
+
+
+def compact(claude_dir: Path, keep_days: int) -> dict:
+    """流式压缩 history.jsonl，返回统计信息。
+
+    为了不丢失并发追加的记录，分三步进行：
+    1. 把 history.jsonl 改名为 history.jsonl.compacting，之后 Claude Code 的追加写入新的 history.jsonl
+    2. 处理改名后的文件：旧记录写入压缩段，保留的记录写入 history.jsonl.compact；
+       压缩段落盘后先保存索引（pending 标记记录处理到的偏移和保留文件的长度），再动 history.jsonl
+    3. 把改名后文件的尾部和新 history.jsonl 的内容追加到保留文件，再用它替换 history.jsonl，
+       替换后把仍持有旧文件句柄的进程在此期间写入的内容补追加进去
+
+    第 3 步的替换同时移走了保留文件，因此中断后重新执行 compact 可以判断进度：
+    - 没有 pending 标记：重新处理改名后的文件（未登记到索引的块只是压缩段中的无用字节）
+    - 有 pending 标记且保留文件还在：截断到记录的长度后重做合并，不会重复归档
+    - 有 pending 标记但保留文件已不在：合并已完成，只做清理
+    """
+    history = claude_dir / HISTORY_FILE
+    aside = claude_dir / f"{HISTORY_FILE}.compacting"
+    kept_file = claude_dir / f"{HISTORY_FILE}.compact"
+    archive = claude_dir / ARCHIVE_DIR
+    archive.mkdir(parents=True, exist_ok=True)
+    index = load_index(archive)
+    cutoff = int((time.time() - keep_days * 86400) * 1000)
+
+    stats = {"lines": 0, "bytes": 0, "duplicates": 0, "archived": 0, "kept": 0, "compressed": 0, "segments": []}
+    if not aside.exists():
+        # 上次已完整结束，残留的 pending 标记已失效
+        index.pop("pending", None)
+        if not history.exists():
+            return stats
+        os.replace(history, aside)
+
+    pending = index.get("pending")
+    if pending is None or kept_file.exists():
+        with open(aside, "rb", buffering=READ_BUFFER) as src:
+            if pending is None:
+                consumed = _archive_aside(src, kept_file, archive, index, cutoff, stats)
+                # 压缩段已写完，先登记索引再改动 history.jsonl；之后中断也不会重复归档
+                pending = index["pending"] = {"consumed": consumed, "kept": kept_file.stat().st_size}
+                index["live_since"] = max(index.get("live_since", 0), cutoff)
+                save_index(archive, index)
+            _merge_live(src, pending, kept_file, history)
+
+    os.unlink(aside)
+    index.pop("pending", None)
+    save_index(archive, index)
+    return stats
+
+
+def _merge_live(src: BinaryIO, pending: dict, kept_file: Path, history: Path) -> None:
+    """把改名后文件的尾部和新 history.jsonl 追加到保留文件，再替换 history.jsonl。"""
+    # 确保 history.jsonl 存在并持有其句柄，合并期间写入它的内容在替换后还能补回
+    open(history, "ab").close()
+    with open(history, "rb", buffering=READ_BUFFER) as fresh:
+        with open(kept_file, "r+b", buffering=READ_BUFFER) as out:
+            # 上次合并中断时保留文件末尾可能已追加了部分内容
+            out.truncate(pending["kept"])
+            out.seek(0, os.SEEK_END)
+            aside_end = _copy_from(src, pending["consumed"], out)
+            fresh_end = _copy_from(fresh, 0, out)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(kept_file, history)
+        with open(history, "ab") as live:
+            _copy_from(src, aside_end, live)
+            _copy_from(fresh, fresh_end, live)
+
+
+def _archive_aside(src: BinaryIO, kept_file: Path, archive: Path, index: dict, cutoff: int, stats: dict) -> int:
+    """去重并把早于 cutoff 的记录写入按月压缩段，其余写入 kept_file，返回已处理到的偏移。"""
+    writers: dict[str, SegmentWriter] = {}
+    month_start = month_end = 0
+    writer: SegmentWriter | None = None
+    seen: set[int] = set()
+    window: deque[int] = deque()
+
+    lines = total = duplicates = kept = archived = consumed = 0
+    with open(kept_file, "wb", buffering=READ_BUFFER) as live:
+        for line, consumed in read_lines(src, os.fstat(src.fileno()).st_size):
+            lines += 1
+            total += len(line)
+            if not line.strip():
+                continue
+
+            key = hash(line)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            window.append(key)
+            if len(window) > DEDUPE_WINDOW:
+                seen.discard(window.popleft())
+
+            ts, project = parse_record(line)
+            if ts is None or ts >= cutoff:
+                live.write(line)
+                kept += 1
+                continue
+
+            if writer is None or not month_start <= ts < month_end:
+                month_start, month_end, name = month_range(ts)
+                writer = writers.get(name)
+                if writer is None:
+                    writer = writers[name] = SegmentWriter(archive, name, index)
+            writer.add(line, ts, project)
+            archived += 1
+
+        for writer in writers.values():
+            writer.close()
+        live.flush()
+        os.fsync(live.fileno())
+
+    stats.update(lines=lines, bytes=total, duplicates=duplicates, kept=kept, archived=archived)
+    stats["compressed"] = sum((archive / name).stat().st_size for name in writers)
+    stats["segments"] = sorted(writers)
+    return consumed
+
+
+def parse_date(value: str) -> int:
+    return int(datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def query(claude_dir: Path, project: str | None, since: int | None, until: int | None) -> Iterator[bytes]:
+    """按项目和时间范围查询：压缩段通过索引只解压命中的块，当前文件顺序扫描。"""
+    archive = claude_dir / ARCHIVE_DIR
+    index = load_index(archive)
+    lo = since if since is not None else 0
+    hi = until if until is not None else 1 << 62
+
+    if project is None:
+        candidates = [(name, i) for name, blocks in index["segments"].items() for i in range(len(blocks))]
+    else:
+        candidates = [tuple(ref) for ref in index["projects"].get(project, [])]
+
+    def matches(line: bytes) -> bool:
+        ts, line_project = parse_record(line)
+        if ts is None or not lo <= ts < hi:
+            return False
+        return project is None or line_project == project
+
+    handles: dict[str, BinaryIO] = {}
+    try:
+        for name, block_id in sorted(candidates, key=lambda ref: (ref[0], ref[1])):
+            offset, length, min_ts, max_ts = index["segments"][name][block_id]
+            if max_ts < lo or min_ts >= hi:
+                continue
+            f = handles.get(name) or handles.setdefault(name, open(archive / name, "rb"))
+            f.seek(offset)
+            for line in gzip.decompress(f.read(length)).splitlines(keepends=True):
+                if matches(line):
+                    yield line
+    finally:
+        for f in handles.values():
+            f.close()
+
+    history = claude_dir / HISTORY_FILE
+    if history.exists() and hi > index.get("live_since", 0):
+        with open(history, "rb", buffering=READ_BUFFER) as f:
+            for line in f:
+                if matches(line):
+                    yield line
+
+
+def cmd_compact(args: argparse.Namespace) -> int:
+    claude_dir = Path(args.claude_dir)
+    start = time.perf_counter()
+    stats = compact(claude_dir, args.keep_days)
+    elapsed = time.perf_counter() - start
+    if not stats["lines"]:
+        print(f"没有需要处理的历史: {claude_dir / HISTORY_FILE}")
+        return 0
+    print(f"读取: {stats['lines']} 行，{stats['bytes'] / 1024 / 1024:.1f} MB（{elapsed:.1f}s）")
+    print(f"重复记录: {stats['duplicates']}")
+    print(f"归档: {stats['archived']} 行 → {', '.join(stats['segments']) or '-'}")
+    print(f"保留在 {HISTORY_FILE}: {stats['kept']} 行（最近 {args.keep_days} 天）")
+    return 0
+
+
+def cmd_query(args: argparse.Namespace) -> int:
+    since = parse_date(args.since) if args.since else None
+    until = parse_date(args.until) if args.until else None
+    out = sys.stdout.buffer
+    for count, line in enumerate(query(Path(args.claude_dir), args.project, since, until), start=1):
+        out.write(line)
+        if args.limit and count >= args.limit:
+            break
+    return 0
+
+
+def generate_history(path: Path, size_bytes: int, projects: int = 40, seed: int = 42) -> int:
+    """生成按时间递增的合成历史（约 2% 相邻重复），返回行数。"""
+    rng = random.Random(seed)
+    names = [f"/home/dev/work/project-{i:02d}" for i in range(projects)]
+    now = int(time.time() * 1000)
+    start = now - 2 * 365 * 86400 * 1000
+    words = "fix refactor review the layout check component api handler test deploy config".split()
+    lines = 0
+    written = 0
+    with open(path, "wb", buffering=READ_BUFFER) as f:
+        previous = b""
+        while written < size_bytes:
+            if previous and rng.random() < 0.02:
+                line = previous
+            else:
+                ts = start + (now - start) * written // size_bytes
+                display = " ".join(rng.choice(words) for _ in range(rng.randint(4, 20)))
+                record = {"display": display, "pastedContents": {}, "timestamp": ts, "project": rng.choice(names)}
+                line = (json.dumps(record) + "\n").encode("utf-8")
+            f.write(line)
+            previous = line
+            written += len(line)
+            lines += 1
+    return lines
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    work = Path(tempfile.mkdtemp(prefix="history-bench-"))
+    try:
+        history = work / HISTORY_FILE
+        start = time.perf_counter()
+        lines = generate_history(history, args.size_mb * 1024 * 1024)
+        generate = time.perf_counter() - start
+        size = history.stat().st_size
+        rss_before = _peak_rss_mb()
+
+        start = time.perf_counter()
+        stats = compact(work, args.keep_days)
+        elapsed = time.perf_counter() - start
+
+        project = "/home/dev/work/project-07"
+        since = int((time.time() - 400 * 86400) * 1000)
+        until = since + 30 * 86400 * 1000
+        start = time.perf_counter()
+        hits = sum(1 for _ in query(work, project, since, until))
+        indexed = time.perf_counter() - start
+
+        index_size = (work / ARCHIVE_DIR / INDEX_FILE).stat().st_size
+        print(f"生成历史: {size / 1024 / 1024:.0f} MB，{lines} 行（{generate:.1f}s）")
+        print(f"compact: {elapsed:.1f}s，吞吐 {size / 1024 / 1024 / elapsed:.0f} MB/s")
+        print(f"去重: {stats['duplicates']} 行，归档 {stats['archived']} 行，保留 {stats['kept']} 行")
+        print(f"压缩段: {stats['compressed'] / 1024 / 1024:.0f} MB（{len(stats['segments'])} 个月），索引 {index_size // 1024} KB")
+        print(f"按项目 + 30 天查询: {hits} 条，{indexed * 1000:.0f} ms")
+        if rss_before is not None:
+            print(f"峰值 RSS: 生成后 {rss_before:.1f} MB / compact 与查询后 {_peak_rss_mb():.1f} MB")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="~/.claude 运行时历史维护")
+    parser.add_argument("--claude-dir", default=str(DEFAULT_CLAUDE_DIR), help="Claude Code 配置目录")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    compact_cmd = sub.add_parser("compact", help="去重、按月轮转压缩旧记录并更新索引")
+    compact_cmd.add_argument("--keep-days", type=int, default=DEFAULT_KEEP_DAYS, help="保留在 history.jsonl 中的天数")
+    compact_cmd.set_defaults(func=cmd_compact)
+
+    query_cmd = sub.add_parser("query", help="按项目 / 日期范围查询历史（输出 JSONL）")
+    query_cmd.add_argument("--project", help="项目绝对路径")
+    query_cmd.add_argument("--since", help="起始日期（含），格式 YYYY-MM-DD")
+    query_cmd.add_argument("--until", help="结束日期（不含），格式 YYYY-MM-DD")
+    query_cmd.add_argument("--limit", type=int, default=0, help="最多输出条数")
+    query_cmd.set_defaults(func=cmd_query)
+
+    bench = sub.add_parser("bench", help="在生成的历史文件上测试吞吐和内存")
+    bench.add_argument("--size-mb", type=int, default=2048, help="生成的历史文件大小（MB）")
+    bench.add_argument("--keep-days", type=int, default=DEFAULT_KEEP_DAYS, help="保留天数")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,610 @@
+#!/usr/bin/env python3
+"""项目指纹引擎（独立工具），/project-scan、/project-init 等命令可直接注入 scan 的输出。
+
+并行遍历目录树，从清单文件识别技术栈（与 go-dev / java-dev / frontend-dev / python-dev 技能对应），
+输出紧凑的 JSON 项目画像：语言分布、各子项目的框架与构建 / 测试 / 运行命令、Docker 文件和建议的忽略规则。
+
+缓存按目录粒度保存在 ~/.claude/cache/project-scan/：
+- 目录签名（目录 mtime + 清单文件大小和 mtime）未变 → 不列目录，直接复用该目录的汇总
+- 目录有变化 → 重新汇总，但清单文件按内容哈希复用解析结果
+
+用法：
+    project_fingerprint.py scan [目录] [--pretty] [--workers 16] [--cache-dir DIR]
+    project_fingerprint.py bench [--files 50000] [--workers 16]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+DEFAULT_CACHE_DIR = Path.home() / ".claude" / "cache" / "project-scan"
+CACHE_VERSION = 1
+DEFAULT_WORKERS = 16
+RACY_SECONDS = 2
+
+IGNORE_DIRS = {
+    ".git", ".svn", ".hg", ".idea", ".vscode", ".cache", ".gradle", ".mypy_cache", ".pytest_cache",
+    ".ruff_cache", ".venv", "venv", "__pycache__", "node_modules", "vendor", "target", "dist",
+    "build", "out", "coverage", ".next", ".nuxt", ".output",
+}
+MANIFESTS = ("go.mod", "pom.xml", "build.gradle", "build.gradle.kts", "package.json", "pyproject.toml", "requirements.txt")
+MARKERS = (
+    "Dockerfile", "docker-compose.yml", "docker-compose.yaml", "compose.yml", "compose.yaml", ".dockerignore",
+    ".gitignore", "Makefile", "restart.sh", "CLAUDE.md", "main.go", "mvnw", "gradlew",
+    "pnpm-lock.yaml", "yarn.lock", "package-lock.json", "bun.lockb", "uv.lock", "poetry.lock",
+    "vite.config.ts", "vite.config.js", "tsconfig.json", "manage.py",
+)
+LANGUAGES = {
+    ".go": "go", ".java": "java", ".kt": "kotlin", ".py": "python", ".ts": "typescript", ".tsx": "typescript",
+    ".js": "javascript", ".jsx": "javascript", ".vue": "vue", ".sh": "shell", ".sql": "sql",
+    ".css": "css", ".scss": "css", ".less": "css", ".html": "html", ".rs": "rust", ".c": "c", ".cpp": "cpp",
+}
+
+# 依赖名 → 框架标签
+GO_FRAMEWORKS = {
+    "github.com/gin-gonic/gin": "gin", "github.com/labstack/echo": "echo", "github.com/gofiber/fiber": "fiber",
+    "gorm.io/gorm": "gorm", "google.golang.org/grpc": "grpc", "github.com/spf13/cobra": "cobra",
+    "github.com/zeromicro/go-zero": "go-zero",
+}
+JAVA_FRAMEWORKS = {
+    "spring-boot": "spring-boot", "spring-cloud": "spring-cloud", "mybatis-plus": "mybatis-plus",
+    "mybatis": "mybatis", "lombok": "lombok", "junit-jupiter": "junit5",
+}
+NODE_FRAMEWORKS = {
+    "vue": "vue", "react": "react", "next": "next", "nuxt": "nuxt", "vite": "vite", "element-plus": "element-plus",
+    "ant-design-vue": "ant-design-vue", "pinia": "pinia", "typescript": "typescript", "express": "express",
+    "@nestjs/core": "nestjs", "vitest": "vitest", "jest": "jest",
+}
+PYTHON_FRAMEWORKS = {
+    "fastapi": "fastapi", "django": "django", "flask": "flask", "pydantic": "pydantic", "sqlalchemy": "sqlalchemy",
+    "celery": "celery", "pytest": "pytest", "uvicorn": "uvicorn",
+}
+STACK_IGNORES = {
+    "go-dev": ["bin/", "*.exe", "*.test", "*.out"],
+    "java-dev": ["target/", "build/", ".gradle/", "*.class", "*.jar", "*.log"],
+    "frontend-dev": ["node_modules/", "dist/", ".vite/", "coverage/", "*.local"],
+    "python-dev": ["__pycache__/", "*.py[cod]", ".venv/", ".pytest_cache/", "*.egg-info/"],
+}
+COMMON_IGNORES = [".env", ".env.*", "!.env.example", ".idea/", ".vscode/", ".DS_Store", "logs/"]
+
+REQUIREMENT_NAME_RE = re.compile(r"^\s*([A-Za-z0-9_.\-]+)")
+GO_DIRECTIVE_RE = re.compile(r"^(module|go)\s+(\S+)", re.M)
+GO_REQUIRE_RE = re.compile(r"^\s*(?:require\s+)?([\w.\-]+\.[\w.\-/]+)\s+v[\w.\-+]+", re.M)
+GRADLE_DEPENDENCY_RE = re.compile(r"['\"]([\w.\-]+:[\w.\-]+)")
+GRADLE_JAVA_RE = re.compile(r"(?:sourceCompatibility|languageVersion)\s*[=(]\s*(?:JavaVersion\.VERSION_|JavaLanguageVersion\.of\()?['\"]?(\d+)")
+
+
+def _match_frameworks(names, table: dict[str, str], substring: bool = False) -> list[str]:
+    """按依赖名匹配框架；Go 模块路径按前缀匹配，Maven / Gradle 构件名按子串匹配（只取最长的键）。"""
+    keys = sorted(table, key=len, reverse=True)
+    found = set()
+    for name in names:
+        for key in keys:
+            if name == key or name.startswith(key + "/") or (substring and key in name):
+                found.add(table[key])
+                break
+    return sorted(found)
+
+
+def parse_go_mod(text: str) -> dict:
+    directives = dict(GO_DIRECTIVE_RE.findall(text))
+    requires = GO_REQUIRE_RE.findall(text)
+    return {
+        "stack": "go-dev",
+        "module": directives.get("module"),
+        "version": directives.get("go"),
+        "frameworks": _match_frameworks(requires, GO_FRAMEWORKS),
+    }
+
+
+def parse_pom(text: str) -> dict:
+    root = ET.fromstring(text)
+    for element in root.iter():
+        element.tag = element.tag.rsplit("}", 1)[-1]
+    properties = {child.tag: (child.text or "").strip() for child in root.findall("properties/*")}
+    artifacts = [a.text or "" for a in root.iter("artifactId")]
+    version = (
+        properties.get("java.version")
+        or properties.get("maven.compiler.release")
+        or properties.get("maven.compiler.source")
+    )
+    return {
+        "stack": "java-dev",
+        "build_tool": "maven",
+        "artifact": root.findtext("artifactId"),
+        "version": version,
+        "packaging": root.findtext("packaging") or "jar",
+        "modules": [m.text for m in root.findall("modules/module") if m.text],
+        "frameworks": _match_frameworks(artifacts, JAVA_FRAMEWORKS, substring=True),
+    }
+
+
+def parse_gradle(text: str) -> dict:
+    version = GRADLE_JAVA_RE.search(text)
+    return {
+        "stack": "java-dev",
+        "build_tool": "gradle",
+        "version": version.group(1) if version else None,
+        "frameworks": _match_frameworks(GRADLE_DEPENDENCY_RE.findall(text), JAVA_FRAMEWORKS, substring=True),
+    }
+
+
+def _object(value) -> dict:
+    """JSON 字段可能是 null 或其他类型，统一按空对象处理。"""
+    return value if isinstance(value, dict) else {}
+
+
+def parse_package_json(text: str) -> dict:
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("顶层不是 JSON 对象")
+    deps = {**_object(data.get("dependencies")), **_object(data.get("devDependencies"))}
+    frameworks = [tag for key, tag in NODE_FRAMEWORKS.items() if key in deps]
+    package_manager = data.get("packageManager")
+    if not isinstance(package_manager, str):
+        package_manager = ""
+    return {
+        "stack": "frontend-dev" if {"vue", "react", "next", "nuxt", "vite"} & set(frameworks) else "node",
+        "name": data.get("name"),
+        "package_manager": package_manager.split("@", 1)[0] or None,
+        "scripts": sorted(_object(data.get("scripts"))),
+        "workspaces": bool(data.get("workspaces")),
+        "frameworks": sorted(frameworks),
+    }
+
+
+def _requirement_names(lines) -> list[str]:
+    names = []
+    for line in lines:
+        match = REQUIREMENT_NAME_RE.match(line)
+        if match and not line.lstrip().startswith(("#", "-")):
+            names.append(match.group(1).lower().replace("_", "-"))
+    return names
+
+
+def parse_pyproject(text: str) -> dict:
+    if tomllib is not None:
+        data = tomllib.loads(text)
+        project = data.get("project", {})
+        tool = data.get("tool", {})
+        deps = list(project.get("dependencies", []))
+        for group in project.get("optional-dependencies", {}).values():
+            deps.extend(group)
+        for group in data.get("dependency-groups", {}).values():
+            deps.extend(d for d in group if isinstance(d, str))
+        poetry = tool.get("poetry", {})
+        deps.extend(poetry.get("dependencies", {}))
+        deps.extend(poetry.get("group", {}).get("dev", {}).get("dependencies", {}))
+        names = _requirement_names(deps)
+        requires = project.get("requires-python")
+        scripts = sorted(project.get("scripts", {}))
+        manager = "poetry" if poetry else ("uv" if "uv" in tool else None)
+    else:
+        names = _requirement_names(re.findall(r"^\s*\"([^\"]+)\"", text, re.M))
+        requires_match = re.search(r"requires-python\s*=\s*\"([^\"]+)\"", text)
+        requires = requires_match.group(1) if requires_match else None
+        scripts = []
+        manager = "poetry" if "[tool.poetry]" in text else ("uv" if "[tool.uv]" in text else None)
+    return {
+        "stack": "python-dev",
+        "version": requires,
+        "package_manager": manager,
+        "scripts": scripts,
+        "frameworks": _match_frameworks(names, PYTHON_FRAMEWORKS),
+    }
+
+
+def parse_requirements(text: str) -> dict:
+    return {
+        "stack": "python-dev",
+        "package_manager": "pip",
+        "frameworks": _match_frameworks(_requirement_names(text.splitlines()), PYTHON_FRAMEWORKS),
+    }
+
+
+PARSERS = {
+    "go.mod": parse_go_mod,
+    "pom.xml": parse_pom,
+    "build.gradle": parse_gradle,
+    "build.gradle.kts": parse_gradle,
+    "package.json": parse_package_json,
+    "pyproject.toml": parse_pyproject,
+    "requirements.txt": parse_requirements,
+}
+
+
+def _signature(path: str, manifests) -> str | None:
+    """目录签名：目录自身 mtime（条目增删改名时变化）+ 清单文件的大小和 mtime。
+
+    mtime 距今不足 RACY_SECONDS 时不可信（同一时刻内的再次修改无法区分），返回 None 强制下次重扫。
+    """
+    stat = os.stat(path)
+    if time.time_ns() - stat.st_mtime_ns < RACY_SECONDS * 1_000_000_000:
+        return None
+    parts = [str(stat.st_mtime_ns)]
+    for name in sorted(manifests):
+        try:
+            manifest = os.stat(os.path.join(path, name))
+        except OSError:
+            return None
+        if time.time_ns() - manifest.st_mtime_ns < RACY_SECONDS * 1_000_000_000:
+            return None
+        parts.append(f"{name}:{manifest.st_size}:{manifest.st_mtime_ns}")
+    return "|".join(parts)
+
+
+def parse_manifest(path: str, name: str, previous: dict | None) -> dict:
+    """解析单个清单文件，内容哈希未变时复用上次结果；读取或解析失败记为 error，不中断扫描。"""
+    try:
+        with open(os.path.join(path, name), "rb") as f:
+            raw = f.read()
+    except OSError as exc:
+        return {"hash": None, "facts": {"error": f"{type(exc).__name__}: {exc.strerror or exc}"}}
+    digest = hashlib.sha1(raw).hexdigest()
+    if previous and previous["hash"] == digest:
+        return previous
+    try:
+        facts = PARSERS[name](raw.decode("utf-8", errors="replace"))
+    except Exception as exc:  # 清单格式千奇百怪，任何解析异常都只影响这一个文件
+        facts = {"error": f"{type(exc).__name__}: {exc}"}
+    return {"hash": digest, "facts": facts}
+
+
+def scan_directory(path: str, cached: dict | None) -> tuple[dict, list[str], bool]:
+    """汇总单个目录，返回 (目录汇总, 子目录名列表, 是否复用缓存)。
+
+    目录不可读（权限不足、扫描期间被删除）时返回带 error 的空汇总，不缓存签名，下次重试。
+    """
+    if cached and cached.get("sig"):
+        try:
+            if _signature(path, cached["manifests"]) == cached["sig"]:
+                return cached, cached["subdirs"], True
+        except OSError:
+            pass
+
+    names = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in IGNORE_DIRS:
+                            subdirs.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        names.append(entry.name)
+                except OSError:
+                    continue
+    except OSError as exc:
+        error = f"{type(exc).__name__}: {exc.strerror or exc}"
+        summary = {"sig": None, "files": 0, "languages": {}, "markers": [], "subdirs": [], "manifests": {}, "error": error}
+        return summary, [], False
+    subdirs.sort()
+
+    languages = Counter(LANGUAGES[ext] for ext in (os.path.splitext(n)[1].lower() for n in names) if ext in LANGUAGES)
+    present = set(names)
+    old_manifests = (cached or {}).get("manifests", {})
+    manifests = {name: parse_manifest(path, name, old_manifests.get(name)) for name in MANIFESTS if name in present}
+    try:
+        sig = _signature(path, manifests)
+    except OSError:
+        sig = None
+    summary = {
+        "sig": sig,
+        "files": len(names),
+        "languages": dict(languages),
+        "markers": sorted(present.intersection(MARKERS)),
+        "subdirs": subdirs,
+        "manifests": manifests,
+    }
+    return summary, subdirs, False
+
+
+def _cache_file(cache_dir: Path, root: Path) -> Path:
+    return cache_dir / f"{hashlib.sha1(str(root).encode('utf-8')).hexdigest()[:16]}.json"
+
+
+def walk(root: Path, cache_dir: Path, workers: int) -> tuple[dict[str, dict], dict]:
+    """按层并行遍历目录树，返回 ({相对路径: 目录汇总}, 统计)。"""
+    cache_path = _cache_file(cache_dir, root)
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("version") != CACHE_VERSION:
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    old_dirs = cache.get("dirs", {})
+
+    dirs: dict[str, dict] = {}
+    reused = 0
+    level = [""]
+    base = str(root)
+
+    def scan_batch(batch: list[str]) -> list[tuple[dict, list[str], bool]]:
+        return [scan_directory(os.path.join(base, rel) if rel else base, old_dirs.get(rel)) for rel in batch]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while level:
+            # 按批提交，避免每个目录一个 future 的调度开销
+            size = max(1, len(level) // (workers * 4))
+            batches = [level[i:i + size] for i in range(0, len(level), size)]
+            next_level = []
+            for batch, results in zip(batches, pool.map(scan_batch, batches)):
+                for rel, (summary, subdirs, hit) in zip(batch, results):
+                    dirs[rel] = summary
+                    reused += hit
+                    next_level.extend(f"{rel}/{name}" if rel else name for name in subdirs)
+            level = next_level
+
+    if dirs != old_dirs:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "root": str(root), "dirs": dirs}), encoding="utf-8")
+        os.replace(tmp, cache_path)
+    return dirs, {"dirs": len(dirs), "reused": reused}
+
+
+def _node_commands(facts: dict, markers: list[str]) -> dict:
+    manager = facts.get("package_manager")
+    if not manager:
+        for lockfile, name in (("pnpm-lock.yaml", "pnpm"), ("yarn.lock", "yarn"), ("bun.lockb", "bun")):
+            if lockfile in markers:
+                manager = name
+                break
+        else:
+            manager = "npm"
+    scripts = facts.get("scripts", [])
+    commands = {"package_manager": manager, "install": f"{manager} install"}
+    for key, candidates in (("run", ("dev", "serve", "start")), ("build", ("build",)), ("test", ("test", "test:unit"))):
+        script = next((s for s in candidates if s in scripts), None)
+        if script:
+            commands[key] = f"{manager} run {script}"
+    return commands
+
+
+def stack_commands(facts: dict, markers: list[str], subdirs: list[str]) -> dict:
+    """根据清单事实推断构建 / 测试 / 运行命令。"""
+    stack = facts.get("stack")
+    frameworks = facts.get("frameworks", [])
+    if stack == "go-dev":
+        run = "go run ." if "main.go" in markers else ("go run ./cmd/..." if "cmd" in subdirs else None)
+        return {"build": "go build ./...", "test": "go test ./...", "run": run}
+    if stack == "java-dev" and facts.get("build_tool") == "maven":
+        mvn = "./mvnw" if "mvnw" in markers else "mvn"
+        run = f"{mvn} spring-boot:run" if "spring-boot" in frameworks else None
+        return {"build": f"{mvn} -q -DskipTests package", "test": f"{mvn} test", "run": run}
+    if stack == "java-dev":
+        gradle = "./gradlew" if "gradlew" in markers else "gradle"
+        run = f"{gradle} bootRun" if "spring-boot" in frameworks else None
+        return {"build": f"{gradle} build -x test", "test": f"{gradle} test", "run": run}
+    if stack in ("frontend-dev", "node"):
+        return _node_commands(facts, markers)
+    if stack == "python-dev":
+        manager = facts.get("package_manager")
+        if "uv.lock" in markers:
+            manager = "uv"
+        elif "poetry.lock" in markers:
+            manager = "poetry"
+        prefix = {"uv": "uv run ", "poetry": "poetry run "}.get(manager or "", "")
+        install = {"uv": "uv sync", "poetry": "poetry install"}.get(manager or "", "pip install -r requirements.txt")
+        commands = {"package_manager": manager or "pip", "install": install}
+        if "pytest" in frameworks:
+            commands["test"] = f"{prefix}pytest"
+        if "manage.py" in markers:
+            commands["run"] = f"{prefix}python manage.py runserver"
+        return commands
+    return {}
+
+
+def build_profile(root: Path, dirs: dict[str, dict]) -> dict:
+    """把目录汇总聚合为项目画像。"""
+    languages: Counter = Counter()
+    files = 0
+    stacks = []
+    skipped = []
+    docker = {"dockerfiles": [], "compose": []}
+    existing = []
+    for rel in sorted(dirs):
+        summary = dirs[rel]
+        if "error" in summary:
+            skipped.append({"path": rel or ".", "error": summary["error"]})
+        files += summary["files"]
+        languages.update(summary["languages"])
+        markers = summary["markers"]
+        for marker in markers:
+            path = f"{rel}/{marker}" if rel else marker
+            if marker == "Dockerfile":
+                docker["dockerfiles"].append(path)
+            elif "compose" in marker:
+                docker["compose"].append(path)
+            elif marker in ("CLAUDE.md", "restart.sh", ".gitignore", ".dockerignore"):
+                existing.append(path)
+
+        seen_python = False
+        for name, manifest in summary["manifests"].items():
+            facts = manifest["facts"]
+            if "error" in facts:
+                stacks.append({"path": rel or ".", "manifest": name, "error": facts["error"]})
+                continue
+            # 同目录同时有 pyproject.toml 和 requirements.txt 时只保留前者
+            if facts["stack"] == "python-dev":
+                if seen_python:
+                    continue
+                seen_python = True
+            entry = {"path": rel or ".", "manifest": name}
+            entry.update({k: v for k, v in facts.items() if v not in (None, [], False)})
+            commands = stack_commands(facts, markers, summary["subdirs"])
+            entry.update({k: v for k, v in commands.items() if v})
+            entry.pop("scripts", None)
+            stacks.append(entry)
+
+    skills = sorted({s["stack"] for s in stacks if s.get("stack") in STACK_IGNORES})
+    ignores = list(COMMON_IGNORES)
+    for skill in skills:
+        ignores.extend(p for p in STACK_IGNORES[skill] if p not in ignores)
+    return {
+        "root": str(root),
+        "files": files,
+        "dirs": len(dirs),
+        "languages": dict(languages.most_common(8)),
+        "skills": skills,
+        "stacks": stacks,
+        "docker": {k: v for k, v in docker.items() if v},
+        "existing": existing,
+        "ignore": ignores,
+        **({"skipped": skipped} if skipped else {}),
+    }
+
+
+def cmd_scan(args: argparse.Namespace) -> int:
+    root = Path(args.root).resolve()
+    start = time.perf_counter()
+    dirs, stats = walk(root, Path(args.cache_dir), args.workers)
+    profile = build_profile(root, dirs)
+    elapsed = time.perf_counter() - start
+    if args.pretty:
+        print(json.dumps(profile, ensure_ascii=False, indent=2))
+    else:
+        print(json.dumps(profile, ensure_ascii=False, separators=(",", ":")))
+    print(f"扫描 {stats['dirs']} 个目录（复用缓存 {stats['reused']}），耗时 {elapsed * 1000:.0f} ms", file=sys.stderr)
+    return 0
+
+
+SAMPLE_MANIFESTS = {
+    "go": {
+        "go.mod": "module example.com/{name}\n\ngo 1.22\n\nrequire (\n\tgithub.com/gin-gonic/gin v1.9.1\n\tgorm.io/gorm v1.25.5\n)\n",
+        "main.go": "package main\n\nfunc main() {}\n",
+    },
+    "java": {
+        "pom.xml": (
+            '<?xml version="1.0"?>\n<project xmlns="http://maven.apache.org/POM/4.0.0">\n'
+            "<parent><groupId>org.springframework.boot</groupId><artifactId>spring-boot-starter-parent</artifactId></parent>\n"
+            "<artifactId>{name}</artifactId><properties><java.version>17</java.version></properties>\n"
+            "<dependencies><dependency><artifactId>mybatis-plus-boot-starter</artifactId></dependency></dependencies>\n"
+            "</project>\n"
+        ),
+    },
+    "web": {
+        "package.json": '{"name": "{name}", "scripts": {"dev": "vite", "build": "vite build"}, '
+        '"dependencies": {"vue": "^3.4.0", "element-plus": "^2.5.0"}, "devDependencies": {"vite": "^5.0.0", "typescript": "^5.3.0"}}\n',
+        "pnpm-lock.yaml": "lockfileVersion: '6.0'\n",
+    },
+    "py": {
+        "pyproject.toml": '[project]\nname = "{name}"\nrequires-python = ">=3.11"\ndependencies = ["fastapi>=0.110", "pydantic>=2"]\n\n'
+        '[dependency-groups]\ndev = ["pytest>=8"]\n',
+        "uv.lock": "version = 1\n",
+    },
+}
+SAMPLE_EXTS = {"go": ".go", "java": ".java", "web": ".vue", "py": ".py"}
+
+
+def generate_monorepo(root: Path, files: int, seed: int = 42) -> None:
+    """生成包含 Go / Java / 前端 / Python 服务的 monorepo，以及大量 node_modules 噪声。"""
+    rng = random.Random(seed)
+    services = [(kind, f"{kind}-svc-{i}") for i in range(3) for kind in SAMPLE_MANIFESTS]
+    per_service = max(1, files // len(services))
+    for kind, name in services:
+        base = root / "services" / name
+        base.mkdir(parents=True)
+        for file_name, content in SAMPLE_MANIFESTS[kind].items():
+            (base / file_name).write_text(content.replace("{name}", name), encoding="utf-8")
+        for i in range(per_service):
+            depth = rng.randint(1, 4)
+            sub = base.joinpath("src", *(f"pkg{rng.randint(0, 9)}" for _ in range(depth)))
+            sub.mkdir(parents=True, exist_ok=True)
+            (sub / f"file{i}{SAMPLE_EXTS[kind]}").write_text("// generated\n", encoding="utf-8")
+        if kind == "web":
+            modules = base / "node_modules" / "lodash"
+            modules.mkdir(parents=True)
+            for i in range(200):
+                (modules / f"m{i}.js").write_text("", encoding="utf-8")
+    (root / "Dockerfile").write_text("FROM alpine\n", encoding="utf-8")
+    (root / "docker-compose.yml").write_text("services: {}\n", encoding="utf-8")
+
+    # 模拟已存在一段时间的仓库，避免刚生成的目录全部处于 mtime 不可信窗口
+    past = time.time() - 3600
+    for current, _, file_names in os.walk(root):
+        for name in file_names:
+            os.utime(os.path.join(current, name), (past, past))
+        os.utime(current, (past, past))
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    work = Path(tempfile.mkdtemp(prefix="project-scan-bench-"))
+    try:
+        repo = work / "repo"
+        cache_dir = work / "cache"
+        generate_monorepo(repo, args.files)
+
+        timings = []
+        for label in ("冷扫描", "无变更重扫"):
+            start = time.perf_counter()
+            dirs, stats = walk(repo, cache_dir, args.workers)
+            profile = build_profile(repo, dirs)
+            timings.append((label, time.perf_counter() - start, stats))
+
+        (repo / "services" / "web-svc-0" / "src" / "NewPage.vue").write_text("<template />\n", encoding="utf-8")
+        package = repo / "services" / "go-svc-1" / "go.mod"
+        package.write_text(package.read_text(encoding="utf-8") + "require github.com/spf13/cobra v1.8.0\n", encoding="utf-8")
+        start = time.perf_counter()
+        dirs, stats = walk(repo, cache_dir, args.workers)
+        profile = build_profile(repo, dirs)
+        timings.append(("修改 2 个文件后重扫", time.perf_counter() - start, stats))
+
+        compact = json.dumps(profile, ensure_ascii=False, separators=(",", ":"))
+        print(f"文件数: {profile['files']}，目录数: {profile['dirs']}（CPU {os.cpu_count()} 核，{args.workers} 线程）")
+        for label, elapsed, stats in timings:
+            print(f"{label}: {elapsed * 1000:.0f} ms（复用 {stats['reused']}/{stats['dirs']} 个目录）")
+        print(f"识别技术栈: {len(profile['stacks'])} 个子项目，技能 {', '.join(profile['skills'])}")
+        print(f"画像大小: {len(compact)} 字节")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="项目指纹引擎")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    # 通用选项写在子命令之后（scan . --workers 8），scan 和 bench 共用
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="并行线程数")
+
+    scan = sub.add_parser("scan", parents=[common], help="扫描项目并输出 JSON 画像")
+    scan.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="缓存目录")
+    scan.add_argument("root", nargs="?", default=".", help="项目目录")
+    scan.add_argument("--pretty", action="store_true", help="缩进输出")
+    scan.set_defaults(func=cmd_scan)
+
+    bench = sub.add_parser("bench", parents=[common], help="在生成的 monorepo 上测试冷 / 热扫描耗时")
+    bench.add_argument("--files", type=int, default=50000, help="生成的源文件数")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
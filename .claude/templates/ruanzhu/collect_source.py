@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""软著源代码收集与 DOCX 生成（独立工具，本仓库尚未包含 /ruanzhu 命令）。
+
+流水线处理，内存占用与仓库大小无关：
+1. 遍历源文件（在 git 仓库中使用 git ls-files，否则解析各级 .gitignore）
+2. 多进程并行统计每个文件去除空行和注释后的有效行数（只返回行数）；
+   shell 的 # 只在行首或空白后算注释，JS/TS 保留正则字面量，.vue/.html 只在 <script>/<style> 内按代码规则去注释
+3. 按每页固定行数分页，只选出前 N 页和后 N 页对应的行区间
+4. 仅重新读取落在区间内的文件，逐行流式写入 DOCX（zipfile 直接写 XML，不在内存中构建文档）
+
+用法：
+    collect_source.py build [目录] --name "系统名称" [--pages 60] [--lines-per-page 50] [-o 输出.docx]
+    collect_source.py bench [--lines 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_PAGES = 60
+DEFAULT_LINES_PER_PAGE = 50
+
+# 扩展名 → 注释风格
+C_STYLE = "c"
+JS_STYLE = "js"
+HASH_STYLE = "hash"
+SHELL_STYLE = "shell"
+MARKUP_STYLE = "markup"
+SOURCE_EXTS = {
+    ".go": C_STYLE,
+    ".java": C_STYLE,
+    ".kt": C_STYLE,
+    ".scala": C_STYLE,
+    ".js": JS_STYLE,
+    ".jsx": JS_STYLE,
+    ".ts": JS_STYLE,
+    ".tsx": JS_STYLE,
+    ".c": C_STYLE,
+    ".h": C_STYLE,
+    ".cpp": C_STYLE,
+    ".cs": C_STYLE,
+    ".rs": C_STYLE,
+    ".swift": C_STYLE,
+    ".php": C_STYLE,
+    ".css": C_STYLE,
+    ".scss": C_STYLE,
+    ".less": C_STYLE,
+    ".py": HASH_STYLE,
+    ".sh": SHELL_STYLE,
+    ".rb": HASH_STYLE,
+    ".vue": MARKUP_STYLE,
+    ".html": MARKUP_STYLE,
+}
+# 即使未被 .gitignore 排除也不计入源代码的目录
+EXCLUDE_DIRS = {".git", "node_modules", "vendor", "dist", "build", "target", ".venv", "venv", "__pycache__"}
+MINIFIED_RE = re.compile(r"\.min\.(js|css)$")
+
+_QUOTED = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+_C_COMMENT = r"//[^\n]*|/\*.*?\*/"
+# JS 正则字面量只能出现在运算符、左括号、行首或 return 等关键字之后，其余位置的 / 是除号
+_JS_REGEX = (
+    r"(?:^|(?<=[(,=:\[!&|?{;+\-*%<>~^])|(?<![\w$.])(?:return|typeof|case|void|yield|await|delete|throw|in|of|else|do))"
+    r"[ \t]*/(?![/*])(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[a-z]*"
+)
+COMMENT_PATTERNS = {
+    C_STYLE: re.compile(_QUOTED + r"|`(?:\\.|[^`\\])*`|" + _C_COMMENT, re.S),
+    JS_STYLE: re.compile(_QUOTED + r"|`(?:\\.|[^`\\])*`|" + _JS_REGEX + "|" + _C_COMMENT, re.S | re.M),
+    HASH_STYLE: re.compile(r'"""(?:\\.|[^\\])*?"""|\'\'\'(?:\\.|[^\\])*?\'\'\'|' + _QUOTED + r"|#[^\n]*", re.S),
+    # shell 单引号内没有转义；# 只在行首或空白之后才开始注释（${#arr[@]}、$# 不是注释）
+    SHELL_STYLE: re.compile(r'"(?:\\.|[^"\\])*"|\'[^\']*\'|(?<!\S)#[^\n]*'),
+    # .vue / .html 只去除标记层的 <!-- -->，<script> / <style> 内部再按 JS / CSS 规则处理
+    MARKUP_STYLE: re.compile(r"(<script\b[^>]*>)(.*?)(</script\s*>)|(<style\b[^>]*>)(.*?)(</style\s*>)|<!--.*?-->", re.S | re.I),
+}
+COMMENT_PREFIXES = ("//", "/*", "#", "<!--")
+INVALID_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class GitIgnore:
+    """简化的 .gitignore 匹配：支持 !、目录规则（尾部 /）、锚定路径和 ** 通配。"""
+
+    def __init__(self):
+        self.rules: list[tuple[str, re.Pattern, bool, bool]] = []
+
+    def add_file(self, base: str, path: Path) -> None:
+        for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            regex = self._translate(line.lstrip("/"))
+            if not anchored:
+                regex = "(?:.*/)?" + regex
+            self.rules.append((base, re.compile(regex + "$"), negate, dir_only))
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        out = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+            elif pattern[i] == "*":
+                out.append("[^/]*")
+                i += 1
+            elif pattern[i] == "?":
+                out.append("[^/]")
+                i += 1
+            elif pattern[i] == "[" and "]" in pattern[i + 1:]:
+                end = pattern.index("]", i + 1)
+                out.append("[" + pattern[i + 1:end].replace("!", "^", 1) + "]")
+                i = end + 1
+            else:
+                out.append(re.escape(pattern[i]))
+                i += 1
+        return "".join(out)
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        result = False
+        for base, regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel.startswith(base + "/"):
+                    continue
+                target = rel[len(base) + 1:]
+            else:
+                target = rel
+            if regex.match(target):
+                result = not negate
+        return result
+
+
+def is_source(rel: str) -> bool:
+    parts = rel.split("/")
+    if any(part in EXCLUDE_DIRS for part in parts[:-1]):
+        return False
+    return os.path.splitext(rel)[1].lower() in SOURCE_EXTS and not MINIFIED_RE.search(rel)
+
+
+def list_files(root: Path) -> list[str]:
+    """返回按路径排序的源文件相对路径，遵循 .gitignore。"""
+    result = subprocess.run(
+        ["git", "-C", str(root), "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+        capture_output=True,
+    )
+    if result.returncode == 0:
+        paths = [p for p in result.stdout.decode("utf-8", errors="replace").split("\0") if p]
+        return sorted(p for p in paths if is_source(p) and (root / p).is_file())
+
+    ignore = GitIgnore()
+    files: list[str] = []
+    for current, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(current, root).replace(os.sep, "/")
+        rel_dir = "" if rel_dir == "." else rel_dir
+        if ".gitignore" in filenames:
+            ignore.add_file(rel_dir, Path(current) / ".gitignore")
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        dirnames[:] = sorted(
+            d for d in dirnames if d not in EXCLUDE_DIRS and not ignore.ignored(prefix + d, True)
+        )
+        for name in filenames:
+            rel = prefix + name
+            if is_source(rel) and not ignore.ignored(rel, False):
+                files.append(rel)
+    return sorted(files)
+
+
+def _keep_code(match: re.Match) -> str:
+    text = match.group(0)
+    return "" if text.startswith(COMMENT_PREFIXES) else text
+
+
+def _keep_markup(match: re.Match) -> str:
+    if match.group(1) is not None:
+        return match.group(1) + strip_comments(match.group(2), JS_STYLE) + match.group(3)
+    if match.group(4) is not None:
+        return match.group(4) + strip_comments(match.group(5), C_STYLE) + match.group(6)
+    return ""
+
+
+def strip_comments(text: str, style: str) -> str:
+    """按注释风格去除注释，字符串、模板字符串和正则字面量中的注释符号保持原样。"""
+    repl = _keep_markup if style == MARKUP_STYLE else _keep_code
+    return COMMENT_PATTERNS[style].sub(repl, text)
+
+
+def clean_lines(path: str) -> list[str]:
+    """读取文件，去除注释和空行，返回有效代码行。"""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    text = strip_comments(text, SOURCE_EXTS[os.path.splitext(path)[1].lower()])
+    return [line.rstrip() for line in text.splitlines() if line.strip()]
+
+
+def count_lines(path: str) -> int:
+    return len(clean_lines(path))
+
+
+def page_ranges(total: int, pages: int, lines_per_page: int) -> list[tuple[int, int]]:
+    """按完整文档分页后选出前 pages//2 页和后 pages-pages//2 页，返回行区间 [start, end)。"""
+    total_pages = -(-total // lines_per_page)
+    if total_pages <= pages:
+        return [(0, total)] if total else []
+    head = pages // 2
+    tail_start = (total_pages - (pages - head)) * lines_per_page
+    return [(0, head * lines_per_page), (tail_start, total)]
+
+
+def select_lines(
+    root: Path,
+    files: list[str],
+    counts: list[int],
+    ranges: list[tuple[int, int]],
+    pool: ProcessPoolExecutor,
+) -> Iterator[str]:
+    """只重新处理与所选区间相交的文件，按顺序逐行产出。"""
+    needed: list[tuple[str, int]] = []
+    offset = 0
+    for rel, count in zip(files, counts):
+        if any(offset < end and offset + count > start for start, end in ranges):
+            needed.append((rel, offset))
+        offset += count
+
+    paths = [str(root / rel) for rel, _ in needed]
+    for (rel, offset), lines in zip(needed, pool.map(clean_lines, paths, chunksize=4)):
+        for index, line in enumerate(lines, start=offset):
+            if any(start <= index < end for start, end in ranges):
+                yield line
+
+
+def _xml_text(text: str) -> str:
+    text = INVALID_XML_RE.sub("", text.expandtabs(4))
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+<Override PartName="/word/header1.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>
+</Types>"""
+
+ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+DOCUMENT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/header" Target="header1.xml"/>
+</Relationships>"""
+
+# 小五号等宽字体、固定 12 磅行距，A4 纸每页可容纳 50 行
+STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+<w:docDefaults>
+<w:rPrDefault><w:rPr><w:rFonts w:ascii="Courier New" w:hAnsi="Courier New" w:eastAsia="宋体"/><w:sz w:val="18"/></w:rPr></w:rPrDefault>
+<w:pPrDefault><w:pPr><w:spacing w:before="0" w:after="0" w:line="240" w:lineRule="exact"/></w:pPr></w:pPrDefault>
+</w:docDefaults>
+</w:styles>"""
+
+HEADER = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:hdr xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+<w:p><w:pPr><w:tabs><w:tab w:val="right" w:pos="9746"/></w:tabs></w:pPr>
+<w:r><w:t xml:space="preserve">{title}</w:t></w:r><w:r><w:tab/></w:r>
+<w:r><w:t xml:space="preserve">第 </w:t></w:r>
+<w:r><w:fldChar w:fldCharType="begin"/></w:r><w:r><w:instrText xml:space="preserve"> PAGE </w:instrText></w:r>
+<w:r><w:fldChar w:fldCharType="separate"/></w:r><w:r><w:t>1</w:t></w:r><w:r><w:fldChar w:fldCharType="end"/></w:r>
+<w:r><w:t xml:space="preserve"> 页</w:t></w:r></w:p>
+</w:hdr>"""
+
+DOCUMENT_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><w:body>\n'
+)
+DOCUMENT_CLOSE = (
+    '<w:sectPr><w:headerReference w:type="default" r:id="rId2"/>'
+    '<w:pgSz w:w="11906" w:h="16838"/>'
+    '<w:pgMar w:top="1134" w:right="1080" w:bottom="1134" w:left="1080" w:header="567" w:footer="567" w:gutter="0"/>'
+    "</w:sectPr></w:body></w:document>"
+)
+PAGE_BREAK = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>\n'
+
+
+def write_docx(output: Path, title: str, lines: Iterable[str], lines_per_page: int) -> tuple[int, int]:
+    """流式写入 DOCX，每 lines_per_page 行插入分页符，返回 (行数, 页数)。"""
+    written = 0
+    tmp = output.with_suffix(output.suffix + ".tmp")
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", CONTENT_TYPES)
+        docx.writestr("_rels/.rels", ROOT_RELS)
+        docx.writestr("word/_rels/document.xml.rels", DOCUMENT_RELS)
+        docx.writestr("word/styles.xml", STYLES)
+        docx.writestr("word/header1.xml", HEADER.format(title=_xml_text(title)))
+        with docx.open("word/document.xml", "w", force_zip64=True) as stream:
+            stream.write(DOCUMENT_OPEN.encode("utf-8"))
+            for line in lines:
+                if written and written % lines_per_page == 0:
+                    stream.write(PAGE_BREAK.encode("utf-8"))
+                paragraph = f'<w:p><w:r><w:t xml:space="preserve">{_xml_text(line)}</w:t></w:r></w:p>\n'
+                stream.write(paragraph.encode("utf-8"))
+                written += 1
+            stream.write(DOCUMENT_CLOSE.encode("utf-8"))
+    os.replace(tmp, output)
+    return written, -(-written // lines_per_page)
+
+
+def build(
+    root: Path,
+    title: str,
+    output: Path,
+    pages: int,
+    lines_per_page: int,
+    workers: int | None = None,
+) -> dict:
+    """执行完整流水线，返回各阶段统计。"""
+    stats: dict = {}
+    start = time.perf_counter()
+    files = list_files(root)
+    stats["walk"] = time.perf_counter() - start
+    stats["files"] = len(files)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        start = time.perf_counter()
+        counts = list(pool.map(count_lines, [str(root / rel) for rel in files], chunksize=16))
+        stats["count"] = time.perf_counter() - start
+
+        stats["lines"] = sum(counts)
+        stats["total_pages"] = -(-stats["lines"] // lines_per_page)
+        ranges = page_ranges(stats["lines"], pages, lines_per_page)
+
+        start = time.perf_counter()
+        selected = select_lines(root, files, counts, ranges, pool)
+        stats["written_lines"], stats["written_pages"] = write_docx(output, title, selected, lines_per_page)
+        stats["write"] = time.perf_counter() - start
+    return stats
+
+
+def cmd_build(args: argparse.Namespace) -> int:
+    root = Path(args.root).resolve()
+    title = f"{args.name} {args.version} 源代码"
+    output = Path(args.output or f"{args.name}_源代码.docx")
+    stats = build(root, title, output, args.pages, args.lines_per_page, args.workers)
+
+    print(f"源文件: {stats['files']}")
+    print(f"有效代码行: {stats['lines']}（完整文档 {stats['total_pages']} 页）")
+    if stats["total_pages"] > args.pages:
+        print(f"选取: 前 {args.pages // 2} 页 + 后 {args.pages - args.pages // 2} 页")
+    print(f"输出: {output}（{stats['written_pages']} 页，{stats['written_lines']} 行）")
+    return 0
+
+
+def generate_repo(root: Path, total_lines: int, seed: int = 42) -> int:
+    """生成混合语言的测试仓库（含注释、空行和被 .gitignore 排除的目录），返回原始行数。"""
+    rng = random.Random(seed)
+    templates = {
+        ".py": ("# comment {i}", '    value_{i} = compute("#{i}", {i})', '"""doc {i}"""'),
+        ".ts": ("// comment {i}", "  const value{i} = compute('//{i}', {i});", "/* block {i} */"),
+        ".go": ("// comment {i}", "\tvalue{i} := compute(\"/*{i}*/\", {i})", "/* block\n * {i}\n */"),
+    }
+    root.mkdir(parents=True, exist_ok=True)
+    (root / ".gitignore").write_text("generated/\n*.log\n", encoding="utf-8")
+    ignored = root / "generated"
+    ignored.mkdir(parents=True)
+    (ignored / "big.py").write_text("x = 1\n" * 10000, encoding="utf-8")
+
+    written = 0
+    index = 0
+    while written < total_lines:
+        ext = rng.choice(list(templates))
+        comment, code, block = templates[ext]
+        path = root / f"pkg{index // 100:03d}" / f"module{index:05d}{ext}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        body = []
+        for i in range(rng.randint(200, 800)):
+            roll = rng.random()
+            if roll < 0.15:
+                body.append(comment.format(i=i))
+            elif roll < 0.25:
+                body.append("")
+            elif roll < 0.28:
+                body.append(block.format(i=i))
+            else:
+                body.append(code.format(i=i))
+        path.write_text("\n".join(body) + "\n", encoding="utf-8")
+        written += len(body)
+        index += 1
+    return written
+
+
+def _peak_rss_mb(children: bool) -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    work = Path(tempfile.mkdtemp(prefix="ruanzhu-bench-"))
+    try:
+        repo = work / "repo"
+        start = time.perf_counter()
+        raw_lines = generate_repo(repo, args.lines)
+        generate = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = build(repo, "基准系统 V1.0 源代码", work / "out.docx", args.pages, args.lines_per_page, args.workers)
+        total = time.perf_counter() - start
+
+        print(f"生成仓库: {stats['files']} 个文件，{raw_lines} 行（{generate:.1f}s，CPU {os.cpu_count()} 核）")
+        print(f"有效代码行: {stats['lines']}（完整文档 {stats['total_pages']} 页）")
+        print(f"遍历: {stats['walk'] * 1000:.0f} ms")
+        print(f"并行统计: {stats['count'] * 1000:.0f} ms")
+        print(f"选页写入: {stats['write'] * 1000:.0f} ms（{stats['written_pages']} 页）")
+        print(f"总耗时: {total * 1000:.0f} ms")
+        if resource is not None:
+            print(f"峰值 RSS: 主进程 {_peak_rss_mb(False):.1f} MB / 单个工作进程 {_peak_rss_mb(True):.1f} MB")
+        print(f"DOCX 大小: {(work / 'out.docx').stat().st_size // 1024} KB")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="软著源代码收集与 DOCX 生成")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    # 分页和并行选项写在子命令之后（build . --pages 60），build 和 bench 共用
+    layout = argparse.ArgumentParser(add_help=False)
+    layout.add_argument("--pages", type=int, default=DEFAULT_PAGES, help="输出页数（前后各一半）")
+    layout.add_argument("--lines-per-page", type=int, default=DEFAULT_LINES_PER_PAGE, help="每页行数")
+    layout.add_argument("--workers", type=int, default=None, help="并行进程数（默认 CPU 核数）")
+
+    build_cmd = sub.add_parser("build", parents=[layout], help="收集源代码并生成 DOCX")
+    build_cmd.add_argument("root", nargs="?", default=".", help="项目目录")
+    build_cmd.add_argument("--name", required=True, help="系统名称")
+    build_cmd.add_argument("--version", default="V1.0", help="版本号")
+    build_cmd.add_argument("-o", "--output", help="输出文件（默认 <系统名称>_源代码.docx）")
+    build_cmd.set_defaults(func=cmd_build)
+
+    bench = sub.add_parser("bench", parents=[layout], help="在生成的仓库上测试耗时和峰值内存")
+    bench.add_argument("--lines", type=int, default=1_000_000, help="生成仓库的总行数")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""GEMINI.md 规则编译器。
+
+Gemini CLI 不支持 rules/ 目录，GEMINI.md 每轮对话都会全量加载。
+规则源文件按章节维护在 .gemini/rules/*.md，frontmatter 中的 commands 标记适用范围：
+- commands: always            → 编译进常驻的 GEMINI.md
+- commands: layout, vue-split → 只内联到对应 .gemini/commands/*.toml 的 prompt 中
+
+编译后输出每个文件和每个命令的 token 报告，超出预算时返回非零退出码。
+
+用法：
+    build_rules.py [--check] [--always-budget N] [--command-budget N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from tokens import estimate_tokens
+
+GEMINI_DIR = Path(__file__).resolve().parent.parent
+RULES_DIR = GEMINI_DIR / "rules"
+COMMANDS_DIR = GEMINI_DIR / "commands"
+OUTPUT = GEMINI_DIR / "GEMINI.md"
+
+ALWAYS = "always"
+SECTION_SEPARATOR = "\n\n---\n\n"
+BEGIN_MARKER = "<!-- rules:begin -->"
+END_MARKER = "<!-- rules:end -->"
+PROMPT_OPEN = 'prompt = """\n'
+
+ALWAYS_BUDGET = 1500
+COMMAND_BUDGET = 10000
+
+
+@dataclass
+class Section:
+    """单个规则章节。"""
+
+    name: str
+    commands: list[str]
+    body: str
+
+
+def parse_section(path: Path) -> Section:
+    """解析规则源文件，frontmatter 只支持 `commands: a, b` 一项。"""
+    text = path.read_text(encoding="utf-8")
+    if not text.startswith("---\n"):
+        raise SystemExit(f"{path}: 缺少 frontmatter")
+    header, sep, body = text[4:].partition("\n---\n")
+    if not sep:
+        raise SystemExit(f"{path}: frontmatter 未闭合")
+
+    commands: list[str] = []
+    for line in header.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip() == "commands":
+            commands = [c.strip() for c in value.split(",") if c.strip()]
+    if not commands:
+        raise SystemExit(f"{path}: frontmatter 缺少 commands")
+    return Section(name=path.stem, commands=commands, body=body.strip("\n"))
+
+
+def load_sections() -> list[Section]:
+    sections = [parse_section(p) for p in sorted(RULES_DIR.glob("*.md"))]
+    known = {p.stem for p in COMMANDS_DIR.glob("*.toml")}
+    for section in sections:
+        unknown = [c for c in section.commands if c != ALWAYS and c not in known]
+        if unknown:
+            raise SystemExit(f"rules/{section.name}.md: 未知命令 {', '.join(unknown)}")
+    return sections
+
+
+def render_gemini_md(sections: list[Section]) -> str:
+    return SECTION_SEPARATOR.join(s.body for s in sections if ALWAYS in s.commands) + "\n"
+
+
+def render_rules_block(sections: list[Section], command: str) -> str:
+    """渲染内联到命令 prompt 中的规则块，无适用章节时返回空字符串。"""
+    bodies = [s.body for s in sections if command in s.commands]
+    if not bodies:
+        return ""
+    block = SECTION_SEPARATOR.join(bodies)
+    block = block.replace("\\", "\\\\").replace('"""', '\\"\\"\\"')
+    return f"{BEGIN_MARKER}\n# 适用规则（由 .gemini/rules/ 编译注入）\n\n{block}\n{END_MARKER}\n\n"
+
+
+def inject(toml_text: str, block: str, path: Path) -> str:
+    """替换命令文件中的规则块；没有标记时插入到 prompt 开头。"""
+    start = toml_text.find(BEGIN_MARKER)
+    if start != -1:
+        end = toml_text.find(END_MARKER, start)
+        if end == -1:
+            raise SystemExit(f"{path}: 规则块缺少结束标记")
+        end += len(END_MARKER)
+        while toml_text[end:end + 1] == "\n":
+            end += 1
+        return toml_text[:start] + block + toml_text[end:]
+
+    if not block:
+        return toml_text
+    open_at = toml_text.find(PROMPT_OPEN)
+    if open_at == -1:
+        raise SystemExit(f'{path}: 未找到 prompt = """ 开头')
+    insert_at = open_at + len(PROMPT_OPEN)
+    return toml_text[:insert_at] + block + toml_text[insert_at:]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="GEMINI.md 规则编译器")
+    parser.add_argument("--check", action="store_true", help="只检查编译结果是否最新，不写文件")
+    parser.add_argument("--always-budget", type=int, default=ALWAYS_BUDGET, help="常驻 GEMINI.md 的 token 预算")
+    parser.add_argument("--command-budget", type=int, default=COMMAND_BUDGET, help="单个命令（GEMINI.md + prompt）的 token 预算")
+    args = parser.parse_args(argv)
+
+    sections = load_sections()
+    outputs: dict[Path, str] = {OUTPUT: render_gemini_md(sections)}
+    for path in sorted(COMMANDS_DIR.glob("*.toml")):
+        block = render_rules_block(sections, path.stem)
+        outputs[path] = inject(path.read_text(encoding="utf-8"), block, path)
+
+    stale = [p for p, text in outputs.items() if not p.exists() or p.read_text(encoding="utf-8") != text]
+    if args.check:
+        for path in stale:
+            print(f"未编译: {path.relative_to(GEMINI_DIR)}", file=sys.stderr)
+    else:
+        for path in stale:
+            path.write_text(outputs[path], encoding="utf-8")
+
+    always_tokens = estimate_tokens(outputs[OUTPUT])
+    failures: list[str] = []
+    if always_tokens > args.always_budget:
+        failures.append(f"GEMINI.md {always_tokens} > {args.always_budget}")
+
+    print("## 规则源文件")
+    print()
+    print("| 章节 | 适用范围 | tokens |")
+    print("|------|---------|--------|")
+    for section in sections:
+        print(f"| {section.name} | {', '.join(section.commands)} | {estimate_tokens(section.body)} |")
+
+    print()
+    print("## 每轮固定上下文")
+    print()
+    print("| 场景 | GEMINI.md | 命令 prompt | 内联规则 | 合计 | 预算 |")
+    print("|------|-----------|-------------|---------|------|------|")
+    print(f"| 普通对话 | {always_tokens} | - | - | {always_tokens} | {args.always_budget} |")
+    for path, text in outputs.items():
+        if path == OUTPUT:
+            continue
+        prompt_tokens = estimate_tokens(text)
+        inline_tokens = estimate_tokens(render_rules_block(sections, path.stem))
+        total = always_tokens + prompt_tokens
+        mark = ""
+        if total > args.command_budget:
+            mark = " ❌"
+            failures.append(f"/{path.stem} {total} > {args.command_budget}")
+        print(f"| /{path.stem} | {always_tokens} | {prompt_tokens} | {inline_tokens} | {total}{mark} | {args.command_budget} |")
+
+    if failures:
+        print()
+        print("超出 token 预算：" + "；".join(failures), file=sys.stderr)
+        return 1
+    if args.check and stale:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""Context7 本地缓存代理。
+
+位于 settings.json 中 context7 的 httpUrl 之前，转发 MCP（Streamable HTTP）请求：
+- resolve-library-id / get-library-docs 的结果按 (工具, 库标识, topic, tokens) 缓存在磁盘，
+  支持 TTL 过期和按总大小的 LRU 淘汰
+- 相同参数的并发请求合并为一次上游调用
+- 上游 429 / 5xx 时，若有过期缓存则直接返回过期结果，避免模型退避等待
+- GET /stats 返回命中、未命中、合并、上游耗时等计数
+
+用法：
+    context7_proxy.py serve [--port 7307] [--upstream URL] [--ttl 小时] [--max-size MB]
+    context7_proxy.py stats [--port 7307]
+    context7_proxy.py bench [--clients 50] [--delay 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+DEFAULT_UPSTREAM = "https://mcp.context7.com/mcp"
+DEFAULT_PORT = 7307
+DEFAULT_CACHE_DIR = Path.home() / ".gemini" / "cache" / "context7"
+DEFAULT_TTL_HOURS = 72
+DEFAULT_MAX_SIZE_MB = 64
+UPSTREAM_TIMEOUT = 60
+LATENCY_SAMPLES = 1000
+
+CACHEABLE_TOOLS = {"resolve-library-id", "get-library-docs"}
+# 转发给上游的请求头（Host、Content-Length 等由 urllib 重新生成）
+FORWARD_HEADERS = ("Content-Type", "Accept", "Authorization", "Mcp-Session-Id", "Mcp-Protocol-Version")
+RETURN_HEADERS = ("Content-Type", "Mcp-Session-Id", "X-Cache")
+
+
+def cache_key(name: str, arguments: dict) -> str:
+    """按工具名和规范化参数（库标识、topic、tokens 等）生成缓存键。"""
+    normalized = {}
+    for key, value in arguments.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if key == "tokens":
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                pass
+        normalized[key] = value
+    raw = json.dumps([name, normalized], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class DocCache:
+    """磁盘缓存：每个条目一个 JSON 文件，内存中按最近访问顺序维护 LRU 索引。"""
+
+    def __init__(self, directory: Path, ttl: float, max_bytes: int):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.index: OrderedDict[str, int] = OrderedDict()
+        self.total = 0
+        directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in directory.glob("*.json"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self.index[key] = size
+            self.total += size
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> tuple[dict, bool] | None:
+        """返回 (result, 是否未过期)，不存在时返回 None。"""
+        with self.lock:
+            if key not in self.index:
+                return None
+            self.index.move_to_end(key)
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(self._path(key))
+        except (OSError, ValueError):
+            self._drop(key)
+            return None
+        return entry["result"], time.time() - entry["stored"] < self.ttl
+
+    def put(self, key: str, request: list, result: dict) -> None:
+        data = json.dumps({"request": request, "stored": time.time(), "result": result}, ensure_ascii=False)
+        tmp = self._path(key).with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, self._path(key))
+        size = len(data.encode("utf-8"))
+        with self.lock:
+            self.total += size - self.index.pop(key, 0)
+            self.index[key] = size
+            while self.total > self.max_bytes and len(self.index) > 1:
+                old, old_size = self.index.popitem(last=False)
+                self.total -= old_size
+                self._path(old).unlink(missing_ok=True)
+
+    def _drop(self, key: str) -> None:
+        with self.lock:
+            self.total -= self.index.pop(key, 0)
+        self._path(key).unlink(missing_ok=True)
+
+
+class SingleFlight:
+    """合并相同键的并发调用：第一个调用者执行，其余等待并共享结果。"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: dict[str, dict] = {}
+
+    def do(self, key: str, fn) -> tuple[object, bool]:
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {"done": threading.Event()}
+        if not leader:
+            call["done"].wait()
+            if "error" in call:
+                raise call["error"]
+            return call["value"], True
+        try:
+            call["value"] = fn()
+            return call["value"], False
+        except BaseException as exc:
+            call["error"] = exc
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call["done"].set()
+
+
+class Stats:
+    """命中 / 未命中 / 合并 / 过期回退 / 上游错误计数，以及耗时分布。"""
+
+    COUNTERS = ("hits", "misses", "coalesced", "stale", "passthrough", "upstream_errors")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = dict.fromkeys(self.COUNTERS, 0)
+        self.latency = {"hit": deque(maxlen=LATENCY_SAMPLES), "upstream": deque(maxlen=LATENCY_SAMPLES)}
+
+    def incr(self, name: str) -> None:
+        with self.lock:
+            self.counts[name] += 1
+
+    def observe(self, kind: str, seconds: float) -> None:
+        with self.lock:
+            self.latency[kind].append(seconds * 1000)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            data: dict = dict(self.counts)
+            lookups = data["hits"] + data["misses"] + data["coalesced"] + data["stale"]
+            data["hit_rate"] = round((lookups - data["misses"]) / lookups, 3) if lookups else 0.0
+            for kind, samples in self.latency.items():
+                ordered = sorted(samples)
+                data[f"{kind}_ms"] = {
+                    "p50": round(ordered[len(ordered) // 2], 1) if ordered else None,
+                    "p95": round(ordered[int(len(ordered) * 0.95)], 1) if ordered else None,
+                }
+            return data
+
+
+class UpstreamError(Exception):
+    """上游返回错误状态或无法连接。"""
+
+    def __init__(self, status: int, headers: dict, body: bytes):
+        super().__init__(f"upstream status {status}")
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+def lower_headers(headers) -> dict[str, str]:
+    """HTTP 头名不区分大小写（fetch 类客户端发送小写），内部统一用小写键。"""
+    return {name.lower(): value for name, value in headers.items()}
+
+
+def read_message(content_type: str, body: bytes, request_id) -> dict | None:
+    """从 JSON 或 SSE 响应体中取出与请求 id 对应的 JSON-RPC 消息。"""
+    if content_type.startswith("text/event-stream"):
+        for event in body.decode("utf-8").replace("\r\n", "\n").split("\n\n"):
+            data = "\n".join(line[5:].lstrip() for line in event.split("\n") if line.startswith("data:"))
+            if not data:
+                continue
+            message = json.loads(data)
+            if isinstance(message, dict) and message.get("id") == request_id:
+                return message
+        return None
+    message = json.loads(body)
+    return message if isinstance(message, dict) else None
+
+
+class Proxy:
+    def __init__(self, upstream: str, cache: DocCache):
+        self.upstream = upstream
+        self.cache = cache
+        self.flight = SingleFlight()
+        self.stats = Stats()
+
+    def forward(self, method: str, body: bytes | None, headers: dict) -> tuple[int, dict, bytes]:
+        """转发到上游；headers 和返回的响应头均为小写键的字典。"""
+        request = urllib.request.Request(self.upstream, data=body, method=method)
+        for name in FORWARD_HEADERS:
+            if headers.get(name.lower()):
+                request.add_header(name, headers[name.lower()])
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=UPSTREAM_TIMEOUT) as response:
+                status, reply_headers, reply = response.status, lower_headers(response.headers), response.read()
+        except urllib.error.HTTPError as exc:
+            status, reply_headers, reply = exc.code, lower_headers(exc.headers), exc.read()
+        except (urllib.error.URLError, OSError) as exc:
+            status, reply_headers, reply = 502, {"content-type": "text/plain"}, str(exc).encode("utf-8")
+        self.stats.observe("upstream", time.perf_counter() - start)
+        return status, reply_headers, reply
+
+    def fetch_result(self, message: dict, headers: dict) -> dict:
+        """调用上游并返回可缓存的 result，错误结果抛出 UpstreamError。"""
+        status, reply_headers, reply = self.forward("POST", json.dumps(message).encode("utf-8"), headers)
+        if status != 200:
+            raise UpstreamError(status, reply_headers, reply)
+        try:
+            answer = read_message(reply_headers.get("content-type", ""), reply, message["id"])
+        except ValueError:
+            raise UpstreamError(502, reply_headers, reply) from None
+        if not answer or not isinstance(answer.get("result"), dict) or answer["result"].get("isError"):
+            raise UpstreamError(status, reply_headers, reply)
+        return answer["result"]
+
+    def call_tool(self, message: dict, headers: dict) -> tuple[int, dict, bytes]:
+        params = message.get("params", {})
+        name, arguments = params.get("name"), params.get("arguments") or {}
+        key = cache_key(name, arguments)
+        start = time.perf_counter()
+
+        cached = self.cache.get(key)
+        if cached and cached[1]:
+            self.stats.incr("hits")
+            self.stats.observe("hit", time.perf_counter() - start)
+            return self._reply(message, cached[0], "HIT")
+
+        try:
+            result, shared = self.flight.do(key, lambda: self._fetch_and_store(key, name, arguments, message, headers))
+        except UpstreamError as exc:
+            self.stats.incr("upstream_errors")
+            if cached and (exc.status == 429 or exc.status >= 500):
+                self.stats.incr("stale")
+                return self._reply(message, cached[0], "STALE")
+            return exc.status, exc.headers, exc.body
+        if shared:
+            self.stats.incr("coalesced")
+            self.stats.observe("hit", time.perf_counter() - start)
+            return self._reply(message, result, "COALESCED")
+        self.stats.incr("misses")
+        return self._reply(message, result, "MISS")
+
+    def _fetch_and_store(self, key: str, name: str, arguments: dict, message: dict, headers: dict) -> dict:
+        result = self.fetch_result(message, headers)
+        self.cache.put(key, [name, arguments], result)
+        return result
+
+    @staticmethod
+    def _reply(message: dict, result: dict, state: str) -> tuple[int, dict, bytes]:
+        body = json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}, ensure_ascii=False)
+        return 200, {"content-type": "application/json", "x-cache": state}, body.encode("utf-8")
+
+    def handle_post(self, body: bytes, headers: dict) -> tuple[int, dict, bytes]:
+        try:
+            message = json.loads(body)
+        except ValueError:
+            message = None
+        if (
+            isinstance(message, dict)
+            and message.get("method") == "tools/call"
+            and message.get("params", {}).get("name") in CACHEABLE_TOOLS
+        ):
+            return self.call_tool(message, headers)
+        self.stats.incr("passthrough")
+        return self.forward("POST", body, headers)
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    server: "ProxyServer"
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, headers: dict, body: bytes) -> None:
+        self.send_response(status)
+        for name in RETURN_HEADERS:
+            if headers.get(name.lower()):
+                self.send_header(name, headers[name.lower()])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._send(*self.server.proxy.handle_post(body, lower_headers(self.headers)))
+
+    def do_GET(self) -> None:
+        if self.path == "/stats":
+            body = json.dumps(self.server.proxy.stats.snapshot(), indent=2).encode("utf-8")
+            self._send(200, {"content-type": "application/json"}, body)
+        else:
+            # 不提供服务端推送流，按 Streamable HTTP 规范返回 405
+            self._send(405, {"content-type": "text/plain"}, b"")
+
+    def do_DELETE(self) -> None:
+        self._send(*self.server.proxy.forward("DELETE", None, lower_headers(self.headers)))
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class ProxyServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], proxy: Proxy):
+        super().__init__(address, ProxyHandler)
+        self.proxy = proxy
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    cache = DocCache(Path(args.cache_dir), args.ttl * 3600, args.max_size * 1024 * 1024)
+    server = ProxyServer(("127.0.0.1", args.port), Proxy(args.upstream, cache))
+    print(f"Context7 缓存代理: http://127.0.0.1:{args.port}/mcp → {args.upstream}")
+    print(f"缓存目录: {args.cache_dir}（{len(cache.index)} 条，{cache.total // 1024} KB）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{args.port}/stats", timeout=5) as response:
+            print(response.read().decode("utf-8"))
+    except OSError as exc:
+        print(f"代理未运行: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """模拟 Context7 上游：固定延迟后以 SSE 返回工具结果，并统计调用次数。"""
+
+    server: "StandInServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        message = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+        if message.get("method") == "tools/call":
+            with self.server.lock:
+                self.server.calls += 1
+            time.sleep(self.server.delay)
+            text = f"docs for {json.dumps(message['params']['arguments'], sort_keys=True)}"
+            result = {"content": [{"type": "text", "text": text}]}
+        else:
+            result = {}
+        payload = json.dumps({"jsonrpc": "2.0", "id": message.get("id"), "result": result})
+        body = f"event: message\ndata: {payload}\n\n".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, delay: float):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+
+def _docs_request(url: str, request_id: int, library: str, topic: str) -> tuple[float, str]:
+    message = {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {
+            "name": "get-library-docs",
+            "arguments": {"context7CompatibleLibraryID": library, "topic": topic, "tokens": 5000},
+        },
+    }
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(message).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Accept": "application/json, text/event-stream"},
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=UPSTREAM_TIMEOUT) as response:
+        response.read()
+        state = response.headers.get("X-Cache", "-")
+    return time.perf_counter() - start, state
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    work = Path(tempfile.mkdtemp(prefix="context7-bench-"))
+    upstream = StandInServer(args.delay / 1000)
+    cache = DocCache(work, DEFAULT_TTL_HOURS * 3600, DEFAULT_MAX_SIZE_MB * 1024 * 1024)
+    proxy = ProxyServer(("127.0.0.1", 0), Proxy(f"http://127.0.0.1:{upstream.server_port}/mcp", cache))
+    for server in (upstream, proxy):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{proxy.server_port}/mcp"
+    topics = [f"topic-{i}" for i in range(args.topics)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            # 1. 并发相同请求：应只产生 1 次上游调用
+            start = time.perf_counter()
+            burst = list(pool.map(lambda i: _docs_request(url, i, "/vuejs/core", "reactivity"), range(args.clients)))
+            burst_wall = time.perf_counter() - start
+            burst_calls = upstream.calls
+
+            # 2. 模拟日常访问：每个 topic 重复请求 rounds 次
+            jobs = [(i, topic) for i in range(args.rounds) for topic in topics]
+            mixed = list(pool.map(lambda job: _docs_request(url, 10_000 + job[0], "/element-plus/element-plus", job[1]), jobs))
+            mixed_calls = upstream.calls - burst_calls
+
+        snapshot = proxy.proxy.stats.snapshot()
+        hit_ms = sorted(t * 1000 for t, state in mixed if state == "HIT")
+        print(f"上游模拟延迟: {args.delay} ms")
+        print(f"并发相同请求: {args.clients} 个 → 上游调用 {burst_calls} 次，总耗时 {burst_wall * 1000:.0f} ms")
+        print(f"重复访问: {len(jobs)} 次（{args.topics} 个 topic × {args.rounds} 轮）→ 上游调用 {mixed_calls} 次")
+        if hit_ms:
+            print(f"缓存命中耗时: p50 {hit_ms[len(hit_ms) // 2]:.1f} ms / p95 {hit_ms[int(len(hit_ms) * 0.95)]:.1f} ms")
+        print(f"计数: {json.dumps(snapshot, ensure_ascii=False)}")
+    finally:
+        proxy.shutdown()
+        upstream.shutdown()
+        shutil.rmtree(work, ignore_errors=True)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Context7 本地缓存代理")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="启动代理")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help="监听端口（仅 127.0.0.1）")
+    serve.add_argument("--upstream", default=DEFAULT_UPSTREAM, help="Context7 MCP 地址")
+    serve.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="缓存目录")
+    serve.add_argument("--ttl", type=float, default=DEFAULT_TTL_HOURS, help="缓存有效期（小时）")
+    serve.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE_MB, help="缓存总大小上限（MB），超出按 LRU 淘汰")
+    serve.set_defaults(func=cmd_serve)
+
+    stats = sub.add_parser("stats", help="查看运行中代理的计数")
+    stats.add_argument("--port", type=int, default=DEFAULT_PORT, help="代理端口")
+    stats.set_defaults(func=cmd_stats)
+
+    bench = sub.add_parser("bench", help="对本地模拟上游测试缓存与请求合并效果")
+    bench.add_argument("--clients", type=int, default=50, help="并发客户端数")
+    bench.add_argument("--delay", type=int, default=300, help="模拟上游延迟（毫秒）")
+    bench.add_argument("--topics", type=int, default=20, help="重复访问阶段的 topic 数")
+    bench.add_argument("--rounds", type=int, default=5, help="每个 topic 的请求轮数")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
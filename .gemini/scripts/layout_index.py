@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""页面布局索引提取器，供 /layout-check 调用。
+
+多进程并行解析 .vue 单文件组件的 <template> / <style> 块，为每个页面提取：
+根容器 class、容器的 position / min-height / padding、标题区 padding-top、
+非 4 倍数间距值、覆盖层的定位方式和 z-index。
+结果按文件 mtime + 内容哈希增量缓存，重复扫描只解析变化的页面。
+
+用法：
+    layout_index.py scan [目录...] [--format table|json] [--workers N] [--cache-dir DIR]
+    layout_index.py bench [--pages N] [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from tokens import estimate_tokens
+
+DEFAULT_DIRS = ("src/views", "src/pages")
+DEFAULT_CACHE_DIR = Path.home() / ".gemini" / "cache" / "layout"
+CACHE_VERSION = 1
+
+SPACING_PROPS = {
+    "padding",
+    "padding-top",
+    "padding-right",
+    "padding-bottom",
+    "padding-left",
+    "margin",
+    "margin-top",
+    "margin-right",
+    "margin-bottom",
+    "margin-left",
+    "gap",
+    "row-gap",
+    "column-gap",
+}
+CONTAINER_PROPS = ("position", "min-height", "padding", "padding-top")
+OVERLAY_NAME_RE = re.compile(r"overlay|mask|modal|loading|empty|cover|backdrop", re.I)
+HEADER_NAME_RE = re.compile(r"header|title", re.I)
+MAGIC_Z_INDEX = 999
+
+TEMPLATE_OPEN_RE = re.compile(r"<template(\s[^>]*)?>", re.I)
+STYLE_RE = re.compile(r"<style(\s[^>]*)?>(.*?)</style>", re.I | re.S)
+HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+ROOT_TAG_RE = re.compile(r"<([a-zA-Z][\w.-]*)([^>]*)>")
+CLASS_ATTR_RE = re.compile(r"(?<![:\w-])class\s*=\s*\"([^\"]*)\"")
+CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+PX_RE = re.compile(r"(-?\d+(?:\.\d+)?)px")
+
+
+def _blank(match: re.Match) -> str:
+    """把注释替换为等量换行，保持行号不变。"""
+    return "\n" * match.group(0).count("\n")
+
+
+def parse_css(css: str, line_offset: int) -> list[dict]:
+    """解析 CSS/SCSS 文本，返回 [{selector, line, decls: {prop: (value, line)}}]。
+
+    支持 SCSS 嵌套（& 拼接父选择器），不支持的语法（@include 等）按普通声明跳过。
+    """
+    css = CSS_COMMENT_RE.sub(_blank, css)
+    rules: list[dict] = []
+    stack: list[dict] = []
+    buf = ""
+    buf_line = line_offset
+    line = line_offset
+
+    for ch in css:
+        if ch == "{":
+            raw = " ".join(buf.split())
+            parent = stack[-1]["selector"] if stack else ""
+            if raw.startswith("@"):
+                selector = parent
+            elif parent and "&" in raw:
+                selector = raw.replace("&", parent)
+            elif parent:
+                selector = f"{parent} {raw}"
+            else:
+                selector = raw
+            rule = {"selector": selector, "line": buf_line, "decls": {}}
+            rules.append(rule)
+            stack.append(rule)
+            buf = ""
+        elif ch == "}" or ch == ";":
+            _add_decl(stack, buf, buf_line)
+            if ch == "}" and stack:
+                stack.pop()
+            buf = ""
+        else:
+            if not buf.strip():
+                buf_line = line
+            buf += ch
+        if ch == "\n":
+            line += 1
+
+    return [r for r in rules if r["decls"]]
+
+
+def _add_decl(stack: list[dict], text: str, line: int) -> None:
+    if not stack or ":" not in text:
+        return
+    prop, _, value = text.partition(":")
+    prop = prop.strip().lower()
+    value = " ".join(value.split()).replace("!important", "").strip()
+    if prop and value and not prop.startswith(("$", "@", "--")):
+        stack[-1]["decls"][prop] = (value, line)
+
+
+def _root_element(template: str) -> tuple[str, list[str]]:
+    """返回模板根元素的标签名和 class 列表。"""
+    match = ROOT_TAG_RE.search(HTML_COMMENT_RE.sub("", template))
+    if not match:
+        return "", []
+    classes = CLASS_ATTR_RE.search(match.group(2))
+    return match.group(1), classes.group(1).split() if classes else []
+
+
+def _last_class(selector: str) -> str:
+    """取选择器最后一段中的 class 名，用于与模板根元素匹配。"""
+    tail = selector.split(",")[-1].strip().split(" ")[-1]
+    found = re.findall(r"\.([\w-]+)", tail)
+    return found[-1] if found else ""
+
+
+def _off_grid(value: str) -> list[str]:
+    """返回值中不是 4 倍数的 px 数值。"""
+    bad = []
+    for num in PX_RE.findall(value):
+        n = float(num)
+        if n != 0 and (n != int(n) or int(n) % 4 != 0):
+            bad.append(f"{num}px")
+    return bad
+
+
+def extract_page(path: str) -> dict:
+    """解析单个 .vue 文件，返回该页面的布局索引条目。"""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        source = f.read()
+
+    entry: dict = {"lines": source.count("\n") + 1}
+
+    template_open = TEMPLATE_OPEN_RE.search(source)
+    template_close = source.rfind("</template>")
+    if template_open and template_close > template_open.end():
+        tag, classes = _root_element(source[template_open.end():template_close])
+        entry["root"] = tag + "".join(f".{c}" for c in classes)
+    else:
+        classes = []
+        entry["root"] = ""
+
+    rules: list[dict] = []
+    for match in STYLE_RE.finditer(source):
+        offset = source.count("\n", 0, match.start(2)) + 1
+        rules.extend(parse_css(match.group(2), offset))
+
+    container: dict = {}
+    header: dict = {}
+    overlays: list[dict] = []
+    off_grid: list[list] = []
+
+    for rule in rules:
+        selector = rule["selector"]
+        decls = rule["decls"]
+        name = _last_class(selector)
+
+        if name and name in classes:
+            for prop in CONTAINER_PROPS:
+                if prop in decls:
+                    container[prop] = decls[prop][0]
+            container.setdefault("selector", selector)
+            container.setdefault("line", rule["line"])
+
+        if name and HEADER_NAME_RE.search(name) and not header:
+            for prop in ("padding-top", "padding"):
+                if prop in decls:
+                    header = {"selector": selector, "prop": prop,
+                              "value": decls[prop][0], "line": decls[prop][1]}
+                    break
+
+        position = decls.get("position", ("", 0))[0]
+        if "z-index" in decls or (position in ("fixed", "absolute") and OVERLAY_NAME_RE.search(selector)):
+            overlay = {"selector": selector, "line": rule["line"], "position": position or "-"}
+            if "z-index" in decls:
+                z_value = decls["z-index"][0]
+                overlay["z-index"] = z_value
+                if z_value.lstrip("-").isdigit() and int(z_value) >= MAGIC_Z_INDEX:
+                    overlay["magic"] = True
+            if "margin-top" in decls:
+                overlay["margin-top"] = decls["margin-top"][0]
+            overlays.append(overlay)
+
+        for prop, (value, line) in decls.items():
+            if prop in SPACING_PROPS:
+                for bad in _off_grid(value):
+                    off_grid.append([line, prop, bad])
+
+    if classes and "selector" not in container:
+        container = {"selector": f".{classes[0]}", "missing": True}
+    entry["container"] = container
+    entry["header"] = header
+    entry["overlays"] = overlays
+    entry["off_grid"] = sorted(off_grid)
+    return entry
+
+
+def _hash_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def find_pages(dirs: list[str]) -> list[str]:
+    """收集页面文件，排除 components 目录和 node_modules。"""
+    pages = []
+    for base in dirs:
+        for root, subdirs, files in os.walk(base):
+            subdirs[:] = [d for d in subdirs if d not in ("components", "node_modules") and not d.startswith(".")]
+            pages.extend(os.path.join(root, name) for name in files if name.endswith(".vue"))
+    return sorted(pages)
+
+
+def _cache_file(cache_dir: Path, dirs: list[str]) -> Path:
+    key = hashlib.sha1("\0".join(os.path.abspath(d) for d in dirs).encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"{key}.json"
+
+
+def build_index(dirs: list[str], cache_dir: Path, workers: int | None = None) -> tuple[dict, dict]:
+    """增量构建布局索引，返回 (索引, 统计)。
+
+    mtime 和大小都未变的文件直接复用；变化的文件先比对内容哈希，
+    哈希仍一致时只刷新 mtime，否则交给进程池重新解析。
+    """
+    cache_path = _cache_file(cache_dir, dirs)
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("version") != CACHE_VERSION:
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    old_files: dict = cache.get("files", {})
+
+    pages = find_pages(dirs)
+    files: dict = {}
+    todo: list[tuple[str, str, int, int]] = []
+    stats = {"pages": len(pages), "reused": 0, "parsed": 0}
+
+    for path in pages:
+        st = os.stat(path)
+        old = old_files.get(path)
+        if old and old["mtime"] == st.st_mtime_ns and old["size"] == st.st_size:
+            files[path] = old
+            stats["reused"] += 1
+            continue
+        digest = _hash_file(path)
+        if old and old["sha1"] == digest:
+            files[path] = dict(old, mtime=st.st_mtime_ns, size=st.st_size)
+            stats["reused"] += 1
+            continue
+        todo.append((path, digest, st.st_mtime_ns, st.st_size))
+
+    if todo:
+        paths = [t[0] for t in todo]
+        if len(todo) < 32:
+            entries = list(map(extract_page, paths))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunk = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+                entries = list(pool.map(extract_page, paths, chunksize=chunk))
+        for (path, digest, mtime, size), entry in zip(todo, entries):
+            files[path] = {"mtime": mtime, "size": size, "sha1": digest, "entry": entry}
+        stats["parsed"] = len(todo)
+
+    if files != old_files:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CACHE_VERSION, "files": files}, ensure_ascii=False))
+        os.replace(tmp, cache_path)
+
+    return {path: files[path]["entry"] for path in pages}, stats
+
+
+def render_json(index: dict) -> str:
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def render_table(index: dict, stats: dict) -> str:
+    """渲染紧凑的 Markdown 表格，直接注入 /layout-check 的 prompt。"""
+    out = [f"## 布局索引（页面 {stats['pages']}，复用缓存 {stats['reused']}，重新解析 {stats['parsed']}）", ""]
+
+    out.append("### 页面容器")
+    out.append("")
+    out.append("| 页面 | 行数 | 根元素 | 容器选择器(行) | position | min-height | padding | 标题区 padding-top(行) |")
+    out.append("|------|------|--------|----------------|----------|------------|---------|------------------------|")
+    for path, e in index.items():
+        c = e["container"]
+        h = e["header"]
+        if c.get("missing"):
+            selector = f"{c['selector']}（无样式）"
+        elif c:
+            selector = f"{c['selector']}({c['line']})"
+        else:
+            selector = "-"
+        header = f"{h['value']}({h['line']})" if h else "-"
+        out.append(f"| {path} | {e['lines']} | {e['root'] or '-'} | {selector} | "
+                   f"{c.get('position', '-')} | {c.get('min-height', '-')} | "
+                   f"{c.get('padding', c.get('padding-top', '-'))} | {header} |")
+
+    off_grid = [(p, e["off_grid"]) for p, e in index.items() if e["off_grid"]]
+    out.append("")
+    out.append(f"### 非 4 倍数间距（{sum(len(rows) for _, rows in off_grid)}，格式：行号:属性=值）")
+    if off_grid:
+        out.append("")
+        out.append("| 页面 | 问题值 |")
+        out.append("|------|--------|")
+        for path, rows in off_grid:
+            out.append(f"| {path} | {', '.join(f'{line}:{prop}={value}' for line, prop, value in rows)} |")
+
+    overlays = [(p, o) for p, e in index.items() for o in e["overlays"]]
+    out.append("")
+    out.append(f"### 覆盖层（{len(overlays)}）")
+    if overlays:
+        out.append("")
+        out.append("| 页面 | 行号 | 选择器 | position | z-index | 备注 |")
+        out.append("|------|------|--------|----------|---------|------|")
+        for path, o in overlays:
+            notes = []
+            if o.get("magic"):
+                notes.append("魔法数字")
+            if "margin-top" in o:
+                notes.append(f"margin-top 偏移 {o['margin-top']}")
+            out.append(f"| {path} | {o['line']} | {o['selector']} | {o['position']} | "
+                       f"{o.get('z-index', '-')} | {'，'.join(notes) or '-'} |")
+
+    return "\n".join(out) + "\n"
+
+
+def cmd_scan(args: argparse.Namespace) -> int:
+    dirs = args.dirs or [d for d in DEFAULT_DIRS if os.path.isdir(d)]
+    if not dirs:
+        print(f"未找到页面目录（默认 {' / '.join(DEFAULT_DIRS)}），请指定扫描路径", file=sys.stderr)
+        return 1
+    index, stats = build_index(dirs, Path(args.cache_dir), args.workers)
+    if args.format == "json":
+        sys.stdout.write(render_json(index))
+    else:
+        sys.stdout.write(render_table(index, stats))
+    return 0
+
+
+def generate_corpus(root: Path, pages: int, seed: int = 42) -> None:
+    """生成用于基准测试的 .vue 页面语料。"""
+    rng = random.Random(seed)
+    spacing = [4, 8, 12, 16, 20, 24, 32] * 6 + [5, 13, 17, 23]
+    for i in range(pages):
+        target = root / f"module{i % 50}" / f"Page{i}.vue"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        items = "\n".join(
+            f'      <el-form-item label="字段{j}"><el-input v-model="form.f{j}" /></el-form-item>'
+            for j in range(rng.randint(20, 80))
+        )
+        methods = "\n".join(
+            f"function handle{j}() {{\n  loading.value = true\n  api.call{j}(form).finally(() => (loading.value = false))\n}}"
+            for j in range(rng.randint(10, 40))
+        )
+        extra = "\n".join(
+            f".block-{j} {{\n  margin-top: {rng.choice(spacing)}px;\n  padding: {rng.choice(spacing)}px {rng.choice(spacing)}px;\n}}"
+            for j in range(rng.randint(10, 40))
+        )
+        target.write_text(
+            f"""<template>
+  <div class="page-container">
+    <div class="page-header"><h2>页面 {i}</h2></div>
+    <el-form :model="form">
+{items}
+    </el-form>
+    <div v-if="locked" class="overlay">请登录</div>
+  </div>
+</template>
+
+<script setup lang="ts">
+import {{ ref, reactive }} from 'vue'
+const loading = ref(false)
+const locked = ref(false)
+const form = reactive({{}})
+{methods}
+</script>
+
+<style scoped lang="scss">
+.page-container {{
+  position: {rng.choice(['relative', 'static'])};
+  min-height: {rng.choice(['calc(100vh - 60px)', '500px', 'auto'])};
+  padding: {rng.choice(spacing)}px;
+  .page-header {{
+    padding-top: {rng.choice(spacing)}px;
+  }}
+}}
+.overlay {{
+  position: {rng.choice(['fixed', 'absolute'])};
+  inset: 0;
+  z-index: {rng.choice([100, 999, 2000])};
+}}
+{extra}
+</style>
+""",
+            encoding="utf-8",
+        )
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    work = Path(tempfile.mkdtemp(prefix="layout-bench-"))
+    try:
+        corpus = work / "views"
+        cache_dir = work / "cache"
+        generate_corpus(corpus, args.pages)
+        pages = find_pages([str(corpus)])
+        raw_tokens = sum(estimate_tokens(Path(p).read_text(encoding="utf-8")) for p in pages)
+
+        start = time.perf_counter()
+        index, _ = build_index([str(corpus)], cache_dir, args.workers)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_index([str(corpus)], cache_dir, args.workers)
+        warm = time.perf_counter() - start
+
+        for path in pages[: max(1, len(pages) // 100)]:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n<style>.tweak { margin: 7px; }</style>\n")
+        start = time.perf_counter()
+        _, stats = build_index([str(corpus)], cache_dir, args.workers)
+        partial = time.perf_counter() - start
+
+        table_tokens = estimate_tokens(render_table(index, {"pages": len(pages), "reused": 0, "parsed": len(pages)}))
+        json_tokens = estimate_tokens(render_json(index))
+
+        print(f"页面数: {len(pages)}（CPU {os.cpu_count()} 核）")
+        print(f"冷扫描: {cold * 1000:.0f} ms")
+        print(f"无变更重扫: {warm * 1000:.0f} ms")
+        print(f"1% 页面变更重扫: {partial * 1000:.0f} ms（重新解析 {stats['parsed']}）")
+        print(f"原始页面 token: {raw_tokens}")
+        print(f"索引 token: 表格 {table_tokens} / JSON {json_tokens}（表格为原始的 {table_tokens / raw_tokens:.1%}）")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="页面布局索引提取器")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    # 通用选项写在子命令之后（scan --workers 2 src/views），scan 和 bench 共用
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--workers", type=int, default=None, help="解析进程数（默认 CPU 核数）")
+
+    scan = sub.add_parser("scan", parents=[common], help="扫描页面目录并输出布局索引")
+    scan.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="索引缓存目录")
+    scan.add_argument("dirs", nargs="*", help=f"页面目录（默认 {' / '.join(DEFAULT_DIRS)}）")
+    scan.add_argument("--format", choices=("table", "json"), default="table", help="输出格式")
+    scan.set_defaults(func=cmd_scan)
+
+    bench = sub.add_parser("bench", parents=[common], help="在生成的语料上测试扫描耗时和索引体积")
+    bench.add_argument("--pages", type=int, default=3000, help="生成的页面数")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
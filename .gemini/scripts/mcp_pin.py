@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""MCP 服务本地固定安装工具，供 sync-config.sh --pin-mcp 调用。
+
+settings.json 中通过 `npx -y <包>` 启动的 MCP 服务，每次会话都要经过 npm 解析和下载，
+离线环境会直接失败。本工具：
+1. 解析并固定精确版本（写入 ~/.gemini/mcp/pins.json，之后不再联网解析）
+2. 安装到 ~/.gemini/mcp/<包>@<版本>/（已安装则跳过）
+3. 把已部署的 settings.json 中对应条目改为 node 直接启动本地入口文件，
+   原始的 npx 条目保存在 ~/.gemini/mcp/sources.json，之后 --update 仍能据此重新解析版本
+
+用法：
+    mcp_pin.py install [--settings FILE] [--update]
+    mcp_pin.py bench [--settings FILE] [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MCP_DIR = Path.home() / ".gemini" / "mcp"
+PINS_FILE = MCP_DIR / "pins.json"
+SOURCES_FILE = MCP_DIR / "sources.json"
+DEFAULT_SETTINGS = Path.home() / ".gemini" / "settings.json"
+READY_TIMEOUT = 180
+
+INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "mcp-pin-bench", "version": "1.0.0"},
+    },
+}
+
+
+def split_spec(spec: str) -> tuple[str, str]:
+    """把 `@scope/name@range` 拆为 (包名, 版本范围)，无范围时返回 latest。"""
+    at = spec.rfind("@")
+    if at > 0:
+        return spec[:at], spec[at + 1:] or "latest"
+    return spec, "latest"
+
+
+def npx_package(server: dict) -> tuple[str, list[str]] | None:
+    """识别 npx 启动的条目，返回 (包规格, 传给服务的其余参数)。"""
+    if os.path.basename(server.get("command", "")) not in ("npx", "npx.cmd"):
+        return None
+    args = list(server.get("args", []))
+    for index, arg in enumerate(args):
+        if arg in ("-y", "--yes"):
+            continue
+        if arg.startswith("-"):
+            return None
+        return arg, args[index + 1:]
+    return None
+
+
+def is_pinned(server: dict) -> bool:
+    """条目是否已被改写为 node 启动本工具安装的入口文件。"""
+    args = server.get("args") or []
+    return bool(args) and str(args[0]).startswith(str(MCP_DIR))
+
+
+def _npm() -> str:
+    npm = shutil.which("npm")
+    if not npm:
+        raise SystemExit("未找到 npm，请先安装 Node.js")
+    return npm
+
+
+def resolve_version(name: str, version_range: str) -> str:
+    """通过 npm view 解析精确版本（遵循当前 npm 的 registry 配置）。"""
+    result = subprocess.run(
+        [_npm(), "view", f"{name}@{version_range}", "version", "--json"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0 or not result.stdout.strip():
+        raise SystemExit(f"解析版本失败: {name}@{version_range}\n{result.stderr.strip()}")
+    value = json.loads(result.stdout)
+    return value[-1] if isinstance(value, list) else value
+
+
+def install_dir(name: str, version: str) -> Path:
+    return MCP_DIR / f"{name.replace('/', '+')}@{version}"
+
+
+def installed_version(target: Path, name: str) -> str | None:
+    try:
+        with open(target / "node_modules" / name / "package.json", encoding="utf-8") as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError):
+        return None
+
+
+def install_package(name: str, version: str) -> Path:
+    """安装固定版本到独立目录，已安装时不访问网络。"""
+    target = install_dir(name, version)
+    if installed_version(target, name) == version:
+        return target
+    target.mkdir(parents=True, exist_ok=True)
+    result = subprocess.run(
+        [_npm(), "install", "--prefix", str(target), "--no-audit", "--no-fund", "--omit=dev", f"{name}@{version}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"安装失败: {name}@{version}\n{result.stderr.strip()}")
+    return target
+
+
+def entry_point(target: Path, name: str) -> Path:
+    """从 package.json 的 bin 字段找到入口文件。"""
+    package_dir = target / "node_modules" / name
+    with open(package_dir / "package.json", encoding="utf-8") as f:
+        bin_field = json.load(f).get("bin")
+    if isinstance(bin_field, str):
+        return package_dir / bin_field
+    if isinstance(bin_field, dict) and bin_field:
+        short = name.rsplit("/", 1)[-1]
+        return package_dir / bin_field.get(short, next(iter(bin_field.values())))
+    raise SystemExit(f"{name} 没有 bin 入口，无法直接启动")
+
+
+def load_json(path: Path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def pin_servers(settings: dict, update: bool) -> list[tuple[str, str, str, Path, list[str], dict]]:
+    """为所有 npx 条目（以及已固定过的条目）解析版本并安装。
+
+    返回 [(条目名, 包名, 版本, 入口文件, 其余参数, 原始 npx 条目)]。
+    """
+    pins = load_json(PINS_FILE)
+    sources = load_json(SOURCES_FILE)
+    pinned = []
+    for key, server in settings.get("mcpServers", {}).items():
+        found = npx_package(server)
+        if found:
+            original = sources[key] = {"command": server["command"], "args": list(server.get("args", []))}
+        elif key in sources and is_pinned(server):
+            original = sources[key]
+            found = npx_package(original)
+        if not found:
+            continue
+        spec, rest = found
+        name, version_range = split_spec(spec)
+        pin_key = f"{name}@{version_range}"
+        if update or pin_key not in pins:
+            pins[pin_key] = resolve_version(name, version_range)
+        version = pins[pin_key]
+        target = install_package(name, version)
+        pinned.append((key, name, version, entry_point(target, name), rest, original))
+    write_json(PINS_FILE, pins)
+    write_json(SOURCES_FILE, sources)
+    return pinned
+
+
+def cmd_install(args: argparse.Namespace) -> int:
+    settings_path = Path(args.settings)
+    settings = load_json(settings_path)
+    node = shutil.which("node")
+    if not node:
+        raise SystemExit("未找到 node，请先安装 Node.js")
+
+    pinned = pin_servers(settings, args.update)
+    if not pinned:
+        print("没有需要固定的 npx MCP 服务")
+        return 0
+
+    for key, name, version, entry, rest, _ in pinned:
+        server = settings["mcpServers"][key]
+        server["command"] = node
+        server["args"] = [str(entry), *rest]
+        print(f"✓ {key}: {name}@{version} → {entry}")
+    write_json(settings_path, settings)
+    print(f"已更新: {settings_path}")
+    return 0
+
+
+def time_to_ready(command: list[str], env: dict[str, str]) -> float:
+    """启动 MCP 服务并发送 initialize，返回收到响应的耗时（秒）。"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        text=True,
+    )
+    try:
+        assert proc.stdin is not None and proc.stdout is not None
+        proc.stdin.write(json.dumps(INITIALIZE_REQUEST) + "\n")
+        proc.stdin.flush()
+        deadline = start + READY_TIMEOUT
+        for line in proc.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("id") == 1:
+                return time.perf_counter() - start
+            if time.perf_counter() > deadline:
+                break
+        raise RuntimeError(f"服务未在 {READY_TIMEOUT}s 内就绪: {' '.join(command)}")
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    settings = load_json(Path(args.settings))
+    node = shutil.which("node")
+    if not node:
+        raise SystemExit("未找到 node，请先安装 Node.js")
+    pinned = pin_servers(settings, update=False)
+    if not pinned:
+        print("没有 npx 启动的 MCP 服务可供测试")
+        return 0
+
+    print("| 服务 | 冷启动 npx（空 npm 缓存） | 固定版本本地启动 | 加速 |")
+    print("|------|--------------------------|------------------|------|")
+    for key, name, version, entry, rest, original in pinned:
+        cold_times = []
+        pinned_times = []
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory(prefix="mcp-bench-npm-") as cache:
+                env = dict(os.environ, npm_config_cache=cache)
+                command = [shutil.which(original["command"]) or original["command"], *original.get("args", [])]
+                cold_times.append(time_to_ready(command, env))
+            pinned_times.append(time_to_ready([node, str(entry), *rest], dict(os.environ)))
+        cold = sorted(cold_times)[len(cold_times) // 2]
+        warm = sorted(pinned_times)[len(pinned_times) // 2]
+        print(f"| {key} ({name}@{version}) | {cold * 1000:.0f} ms | {warm * 1000:.0f} ms | {cold / warm:.1f}x |")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="MCP 服务本地固定安装工具")
+    parser.add_argument("--settings", default=str(DEFAULT_SETTINGS), help="settings.json 路径")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    install = sub.add_parser("install", help="固定版本、安装并改写 settings.json")
+    install.add_argument("--update", action="store_true", help="重新解析版本（升级固定版本）")
+    install.set_defaults(func=cmd_install)
+
+    bench = sub.add_parser("bench", help="对比冷启动 npx 与固定版本的会话就绪耗时")
+    bench.add_argument("--runs", type=int, default=3, help="每种模式的测试次数（取中位数）")
+    bench.set_defaults(func=cmd_bench)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""代码审查 diff 预处理器，供 /code-review 和 /quick-review 调用。
+
+流式读取 git diff，过滤锁文件、生成文件和二进制文件，按 hunk 切分后
+按 token 预算分批输出；已审查过的 hunk 从缓存中取回结论，不再发送给模型。
+
+用法：
+    review_diff.py prepare [--budget N] [--batch N] [-- <git diff 参数>]
+    review_diff.py record < results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from tokens import estimate_tokens
+
+DEFAULT_BUDGET = 12000
+DEFAULT_CACHE_DIR = Path.home() / ".gemini" / "cache" / "review"
+SCRIPT_COMMAND = "python3 ~/.gemini/scripts/review_diff.py"
+
+LOCKFILE_NAMES = {
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "bun.lockb",
+    "go.sum",
+    "Cargo.lock",
+    "poetry.lock",
+    "uv.lock",
+    "Pipfile.lock",
+    "composer.lock",
+    "Gemfile.lock",
+}
+
+GENERATED_PATTERNS = (
+    "dist/*",
+    "*/dist/*",
+    "build/*",
+    "*/build/*",
+    "*/__generated__/*",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*.pb.go",
+    "*_pb2.py",
+    "*.generated.*",
+    "*_generated.*",
+    "*.snap",
+    "auto-imports.d.ts",
+    "components.d.ts",
+)
+
+HUNK_HEADER_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+
+@dataclass
+class Hunk:
+    """单个 hunk 的元数据，只有落在目标批次内时才保留正文。"""
+
+    path: str
+    header: str
+    key: str
+    tokens: int
+    batch: int = 0
+    text: str = ""
+
+
+@dataclass
+class DiffStats:
+    """预处理统计信息。"""
+
+    files: int = 0
+    added: int = 0
+    removed: int = 0
+    filtered: dict[str, list[str]] = field(
+        default_factory=lambda: {"lockfile": [], "generated": [], "binary": []}
+    )
+    hunks_total: int = 0
+    hunks_cached: int = 0
+    tokens_cached: int = 0
+    tokens_filtered: int = 0
+
+
+def classify_path(path: str) -> str:
+    """判断文件是否应被过滤，返回过滤原因，无需过滤时返回空字符串。"""
+    if os.path.basename(path) in LOCKFILE_NAMES:
+        return "lockfile"
+    for pattern in GENERATED_PATTERNS:
+        if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(os.path.basename(path), pattern):
+            return "generated"
+    return ""
+
+
+def hunk_key(path: str, body: str) -> str:
+    """计算 hunk 的缓存键：路径 + hunk 正文的 git blob 哈希。
+
+    正文不含 @@ 行号，因此上方代码增删导致的行号偏移不会使缓存失效。
+    """
+    data = body.encode("utf-8", errors="replace")
+    blob = hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+    return hashlib.sha1(f"{path}\0{blob}".encode("utf-8")).hexdigest()[:16]
+
+
+def stream_git_diff(diff_args: list[str]) -> Iterator[str]:
+    """以流的方式逐行读取 git diff 输出。"""
+    cmd = ["git", "diff", "--no-color", "--no-ext-diff", *diff_args]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    assert proc.stdout is not None
+    try:
+        for raw in proc.stdout:
+            yield raw.decode("utf-8", errors="replace")
+    finally:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise SystemExit(f"git diff 执行失败: {' '.join(cmd)}")
+
+
+def parse_hunks(lines: Iterable[str], stats: DiffStats) -> Iterator[tuple[str, str, str]]:
+    """把 diff 流切分为 (路径, @@ 头, hunk 正文)，同时统计并过滤文件。"""
+    path = ""
+    skip_reason = ""
+    header = ""
+    body: list[str] = []
+
+    def flush() -> Iterator[tuple[str, str, str]]:
+        if header and body and not skip_reason:
+            yield path, header, "".join(body)
+
+    for line in lines:
+        if line.startswith("diff --git "):
+            yield from flush()
+            header = ""
+            body = []
+            stats.files += 1
+            parts = line.rstrip("\n").split(" b/", 1)
+            path = parts[1] if len(parts) == 2 else line.rstrip("\n")[len("diff --git "):]
+            skip_reason = classify_path(path)
+            if skip_reason:
+                stats.filtered[skip_reason].append(path)
+            continue
+        if line.startswith("+++ ") and not header:
+            new_path = line[4:].rstrip("\n")
+            if new_path.startswith("b/"):
+                path = new_path[2:]
+            continue
+        if line.startswith("--- ") and not header:
+            continue
+        if line.startswith("Binary files ") or line.startswith("GIT binary patch"):
+            if not skip_reason:
+                skip_reason = "binary"
+                stats.filtered["binary"].append(path)
+            continue
+        if HUNK_HEADER_RE.match(line):
+            yield from flush()
+            header = line.rstrip("\n")
+            body = []
+            continue
+        if not header:
+            continue
+        if line.startswith("+"):
+            stats.added += 1
+        elif line.startswith("-"):
+            stats.removed += 1
+        if skip_reason:
+            stats.tokens_filtered += estimate_tokens(line)
+            continue
+        body.append(line)
+
+    yield from flush()
+
+
+class ReviewCache:
+    """按 hunk 键存放审查结论的磁盘缓存，每个键一个 JSON 文件。"""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: str) -> None:
+        target = self._path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "result": result}, f, ensure_ascii=False)
+        os.replace(tmp, target)
+
+
+def plan_batches(
+    hunks: Iterable[tuple[str, str, str]],
+    cache: ReviewCache,
+    budget: int,
+    wanted_batch: int,
+    stats: DiffStats,
+) -> tuple[list[Hunk], list[tuple[Hunk, str]], int]:
+    """按预算贪心分批，只保留目标批次的正文和命中缓存的结论。
+
+    批次只由未命中缓存的 hunk 组成，record 之后剩余 hunk 会整体前移，
+    因此后续批次始终通过重新获取第 1 批得到。
+    返回 (目标批次的 hunk, 命中缓存的 hunk 及结论, 剩余批次数)。
+    """
+    selected: list[Hunk] = []
+    cached: list[tuple[Hunk, str]] = []
+    batch = 0
+    batch_tokens = 0
+
+    for path, header, body in hunks:
+        stats.hunks_total += 1
+        key = hunk_key(path, body)
+        text = f"{header}\n{body}"
+        hunk = Hunk(path=path, header=header, key=key, tokens=estimate_tokens(text))
+
+        hit = cache.get(key)
+        if hit is not None:
+            stats.hunks_cached += 1
+            stats.tokens_cached += hunk.tokens
+            cached.append((hunk, hit.get("result", "")))
+            continue
+
+        if batch == 0 or (batch_tokens + hunk.tokens > budget and batch_tokens > 0):
+            batch += 1
+            batch_tokens = 0
+        batch_tokens += hunk.tokens
+        hunk.batch = batch
+        if batch == wanted_batch:
+            hunk.text = text
+            selected.append(hunk)
+
+    return selected, cached, batch
+
+
+def render(
+    selected: list[Hunk],
+    cached: list[tuple[Hunk, str]],
+    total_batches: int,
+    wanted_batch: int,
+    budget: int,
+    stats: DiffStats,
+    next_command: str,
+) -> str:
+    """渲染注入到命令 prompt 中的 Markdown。"""
+    sent_tokens = sum(h.tokens for h in selected)
+    filtered_count = sum(len(v) for v in stats.filtered.values())
+
+    out: list[str] = []
+    out.append("## 变更预处理报告")
+    out.append("")
+    out.append(f"- 文件：{stats.files}（过滤 {filtered_count}："
+               f"锁文件 {len(stats.filtered['lockfile'])} / "
+               f"生成文件 {len(stats.filtered['generated'])} / "
+               f"二进制 {len(stats.filtered['binary'])}）")
+    out.append(f"- 行数：+{stats.added} / -{stats.removed}")
+    out.append(f"- hunk：共 {stats.hunks_total}，本批发送 {len(selected)}，"
+               f"命中缓存跳过 {stats.hunks_cached}")
+    out.append(f"- token：本批发送 {sent_tokens} / 预算 {budget}，"
+               f"缓存跳过 {stats.tokens_cached}，过滤跳过 {stats.tokens_filtered}")
+    out.append(f"- 批次：{min(wanted_batch, total_batches)}/{total_batches}（不含已缓存的 hunk）")
+    if total_batches > 1:
+        out.append(f"- 后续批次：先 record 本批结论，再执行 `{next_command}` 获取（已记录的 hunk 不再发送）")
+
+    for reason, label in (("lockfile", "锁文件"), ("generated", "生成文件"), ("binary", "二进制")):
+        if stats.filtered[reason]:
+            out.append(f"- 已过滤{label}：{', '.join(stats.filtered[reason])}")
+
+    if cached:
+        out.append("")
+        out.append("## 已审查 hunk（缓存结论）")
+        out.append("")
+        for hunk, result in cached:
+            out.append(f"- `{hunk.path}` {hunk.header} [{hunk.key}]：{result or '无问题'}")
+
+    if selected:
+        out.append("")
+        out.append(f"## 待审查 hunk（第 {wanted_batch}/{total_batches} 批）")
+        current_path = ""
+        for hunk in selected:
+            if hunk.path != current_path:
+                current_path = hunk.path
+                out.append("")
+                out.append(f"### {hunk.path}")
+            out.append("")
+            out.append(f"hunk: {hunk.key}")
+            out.append("```diff")
+            out.append(hunk.text.rstrip("\n"))
+            out.append("```")
+    elif not cached:
+        out.append("")
+        out.append("无待审查的变更。")
+
+    return "\n".join(out) + "\n"
+
+
+def next_command(args: argparse.Namespace, diff_args: list[str]) -> str:
+    """生成获取下一批的完整命令（沿用本次的预算、缓存目录和 git diff 参数）。"""
+    parts = [SCRIPT_COMMAND]
+    if args.cache_dir != str(DEFAULT_CACHE_DIR):
+        parts.append(f"--cache-dir {shlex.quote(args.cache_dir)}")
+    parts.append("prepare")
+    if args.budget != DEFAULT_BUDGET:
+        parts.append(f"--budget {args.budget}")
+    if diff_args:
+        parts.append(f"-- {shlex.join(diff_args)}")
+    return " ".join(parts)
+
+
+def cmd_prepare(args: argparse.Namespace) -> int:
+    diff_args = list(args.diff_args)
+    if diff_args and diff_args[0] == "--":
+        diff_args = diff_args[1:]
+
+    stats = DiffStats()
+    cache = ReviewCache(Path(args.cache_dir))
+    hunks = parse_hunks(stream_git_diff(diff_args), stats)
+    selected, cached, total = plan_batches(hunks, cache, args.budget, args.batch, stats)
+    sys.stdout.write(render(selected, cached, total, args.batch, args.budget, stats, next_command(args, diff_args)))
+    return 0
+
+
+def cmd_record(args: argparse.Namespace) -> int:
+    try:
+        results = json.load(sys.stdin)
+    except ValueError as exc:
+        print(f"结论 JSON 解析失败: {exc}", file=sys.stderr)
+        return 1
+    if not isinstance(results, dict):
+        print("结论必须是 {\"hunk 键\": \"结论\"} 形式的 JSON 对象", file=sys.stderr)
+        return 1
+
+    cache = ReviewCache(Path(args.cache_dir))
+    for key, result in results.items():
+        cache.put(str(key), str(result))
+    print(f"已缓存 {len(results)} 个 hunk 的审查结论")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="代码审查 diff 预处理器")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="审查结论缓存目录")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    prepare = sub.add_parser("prepare", help="预处理 git diff 并输出指定批次")
+    prepare.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="每批 token 预算")
+    prepare.add_argument("--batch", type=int, default=1, help="输出第几批（从 1 开始）")
+    prepare.add_argument("diff_args", nargs=argparse.REMAINDER, help="透传给 git diff 的参数")
+    prepare.set_defaults(func=cmd_prepare)
+
+    record = sub.add_parser("record", help="从标准输入读取 {hunk 键: 结论} 并写入缓存")
+    record.set_defaults(func=cmd_record)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""Token 估算工具，供 .gemini/scripts 下的各脚本共用。"""
+
+from __future__ import annotations
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算文本的 token 数。
+
+    ASCII 字符按 4 个字符 1 个 token 计算，中文等非 ASCII 字符按 1 个字符 1 个 token 计算，
+    与 Gemini 的实际计数误差通常在 20% 以内，足以用于预算控制。
+    """
+    ascii_chars = 0
+    other_chars = 0
+    for ch in text:
+        if ord(ch) < 128:
+            ascii_chars += 1
+        else:
+            other_chars += 1
+    return (ascii_chars + 3) // 4 + other_chars
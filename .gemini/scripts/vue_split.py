@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""Vue 单文件组件拆分器，供 /vue-split 调用。
+
+一次扫描按字节偏移切出顶层 <template> / <script> / <style> 块，原样写出：
+- <style>（可多个，保留 scoped / lang / module 属性）→ 独立样式文件，.vue 中改为 src 引用
+- 普通 <script> → 独立 .ts/.js 文件，.vue 中改为 src 引用
+- <script setup> → 组合式函数 useXxx()，.vue 中保留宏（defineProps 等）并解构调用
+
+<script setup> 不支持 src 属性（Vue 编译器会报错），因此改为组合式函数接线。
+拆分只移动代码、不改写代码，剩余的审查和重命名交给模型完成。
+
+用法：
+    vue_split.py <file.vue> [--dry-run] [--force] [--style-dir DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+TAG_RE = re.compile(
+    rb"<!--.*?-->|<(/?)(template|script|style)\b((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>",
+    re.S | re.I,
+)
+ATTR_RE = re.compile(r"([:@\w-]+)(?:\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+)))?")
+
+MACROS = (
+    "defineProps",
+    "withDefaults",
+    "defineEmits",
+    "defineModel",
+    "defineExpose",
+    "defineOptions",
+    "defineSlots",
+)
+MACRO_RE = re.compile(r"\b(" + "|".join(MACROS) + r")\s*[<(]")
+TYPE_DECL_RE = re.compile(r"^(export\s+)?(declare\s+)?(interface|type|(?:const\s+)?enum)\s+([A-Za-z_$][\w$]*)")
+IMPORT_RE = re.compile(r"^import\b")
+STYLE_EXTS = {"css": "css", "scss": "scss", "sass": "sass", "less": "less", "stylus": "styl", "styl": "styl"}
+CONTINUATION_END = set("=,(+-*/&|?:.[{<>!")
+STATEMENT_START_RE = re.compile(r"[A-Za-z_$@/\[]")
+
+
+@dataclass
+class Block:
+    """SFC 顶层块，偏移均为字节偏移。"""
+
+    tag: str
+    attrs: str
+    start: int
+    content_start: int
+    content_end: int
+    end: int
+
+    def attr(self, name: str) -> str | None:
+        for match in ATTR_RE.finditer(self.attrs):
+            if match.group(1) == name:
+                return next((g for g in match.groups()[1:] if g is not None), "")
+        return None
+
+    def lines(self, data: bytes) -> int:
+        content = data[self.content_start:self.content_end].strip(b"\r\n")
+        return content.count(b"\n") + 1 if content else 0
+
+
+def scan_blocks(data: bytes) -> list[Block]:
+    """单次扫描找出顶层块，<template> 内嵌套的 <template> 通过深度计数跳过。"""
+    blocks: list[Block] = []
+    current: tuple[str, str, int, int] | None = None
+    depth = 0
+
+    for match in TAG_RE.finditer(data):
+        if match.group(2) is None:
+            continue
+        closing = match.group(1) == b"/"
+        tag = match.group(2).decode().lower()
+        attrs = match.group(3).decode("utf-8", errors="replace")
+
+        if current is None:
+            if closing:
+                continue
+            if attrs.rstrip().endswith("/"):
+                blocks.append(Block(tag, attrs.rstrip()[:-1], match.start(), match.end(), match.end(), match.end()))
+                continue
+            current = (tag, attrs, match.start(), match.end())
+            depth = 1
+            continue
+
+        if tag != current[0]:
+            continue
+        if closing:
+            depth -= 1
+            if depth == 0:
+                blocks.append(Block(current[0], current[1], current[2], current[3], match.start(), match.end()))
+                current = None
+        elif tag == "template":
+            depth += 1
+
+    return blocks
+
+
+def split_statements(code: str) -> tuple[list[str], set[int]]:
+    """把脚本按顶层语句切分，并返回位于模板字符串内部的行号（这些行不能缩进）。
+
+    只在括号深度为 0、行首为标识符/注释、且上一行不以续行符号结尾时断句，
+    适用于格式化过的 <script setup> 代码。
+    """
+    boundaries = [0]
+    literal_lines: set[int] = set()
+    stack: list[str] = []
+    state = "code"
+    last_sig = ""
+    line_no = 0
+    i = 0
+    n = len(code)
+
+    while i < n:
+        ch = code[i]
+        nxt = code[i + 1] if i + 1 < n else ""
+
+        if ch == "\n":
+            line_no += 1
+            if state == "line_comment":
+                state = "code"
+            if state == "template":
+                literal_lines.add(line_no)
+            elif state == "code" and not stack and last_sig not in CONTINUATION_END:
+                rest = code[i + 1:i + 2]
+                if rest and STATEMENT_START_RE.match(rest):
+                    boundaries.append(i + 1)
+            i += 1
+            continue
+
+        if state == "line_comment":
+            i += 1
+            continue
+        if state == "block_comment":
+            if ch == "*" and nxt == "/":
+                state = "code"
+                i += 2
+                continue
+            i += 1
+            continue
+        if state in ("'", '"'):
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == state:
+                state = "code"
+                last_sig = ch
+            i += 1
+            continue
+        if state == "template":
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == "`":
+                state = "code"
+                last_sig = ch
+            elif ch == "$" and nxt == "{":
+                stack.append("${")
+                state = "code"
+                i += 2
+                continue
+            i += 1
+            continue
+
+        if ch == "/" and nxt == "/":
+            state = "line_comment"
+            i += 2
+            continue
+        if ch == "/" and nxt == "*":
+            state = "block_comment"
+            i += 2
+            continue
+        if ch in ("'", '"'):
+            state = ch
+        elif ch == "`":
+            state = "template"
+        elif ch in "({[":
+            stack.append(ch)
+        elif ch in ")]":
+            if stack:
+                stack.pop()
+        elif ch == "}":
+            if stack and stack.pop() == "${":
+                state = "template"
+                i += 1
+                continue
+        if not ch.isspace():
+            last_sig = ch
+        i += 1
+
+    boundaries.append(n)
+    chunks = [code[a:b] for a, b in zip(boundaries, boundaries[1:]) if code[a:b]]
+
+    statements: list[str] = []
+    pending = ""
+    for chunk in chunks:
+        if _strip_comments(chunk).strip():
+            statements.append(pending + chunk)
+            pending = ""
+        else:
+            pending += chunk
+    if pending:
+        if statements:
+            statements[-1] += pending
+        else:
+            statements.append(pending)
+    return statements, literal_lines
+
+
+def _strip_comments(text: str) -> str:
+    """去掉语句开头的注释，便于判断语句类型。"""
+    text = text.lstrip()
+    while text.startswith(("//", "/*")):
+        if text.startswith("//"):
+            _, _, text = text.partition("\n")
+        else:
+            _, _, text = text.partition("*/")
+        text = text.lstrip()
+    return text
+
+
+def _mask(text: str) -> str:
+    """把注释、字符串和模板字符串替换为空格（保持长度），只留下代码本身。"""
+    out = list(text)
+    state = "code"
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        nxt = text[i + 1] if i + 1 < n else ""
+        if state == "code":
+            if ch == "/" and nxt in ("/", "*"):
+                state = "line_comment" if nxt == "/" else "block_comment"
+                out[i] = out[i + 1] = " "
+                i += 2
+                continue
+            if ch in ("'", '"', "`"):
+                state = ch
+                out[i] = " "
+            i += 1
+            continue
+        if ch != "\n":
+            out[i] = " "
+        if state == "line_comment":
+            if ch == "\n":
+                state = "code"
+        elif state == "block_comment":
+            if ch == "*" and nxt == "/":
+                out[i + 1] = " "
+                state = "code"
+                i += 1
+        elif ch == "\\":
+            if nxt and nxt != "\n":
+                out[i + 1] = " "
+            i += 1
+        elif ch == state:
+            state = "code"
+        i += 1
+    return "".join(out)
+
+
+def _top_level(text: str) -> str:
+    """只保留不在任何 {} 代码块内的代码（函数体、回调体中的内容被去掉）。"""
+    out = []
+    depth = 0
+    for ch in _mask(text):
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth = max(depth - 1, 0)
+        elif depth == 0:
+            out.append(ch)
+    return "".join(out)
+
+
+def has_top_level_await(code: str) -> bool:
+    """<script setup> 中是否有不在函数体 / 代码块内的 await（组件会变为 async setup）。"""
+    statements, _ = split_statements(code.strip("\n"))
+    return any(re.search(r"(?<![\w$.])await\b", _top_level(s)) for s in statements)
+
+
+def reassigned(name: str, statements: list[str]) -> bool:
+    """判断 let / var 声明的绑定在声明之外是否被重新赋值（=、+=、++ 等）。"""
+    escaped = re.escape(name)
+    pattern = re.compile(
+        rf"(?<![\w$.])(?:{escaped}\s*(?:\+\+|--|(?:\*\*|<<|>>>?|&&|\|\||\?\?|[-+*/%&|^])?=(?![=>]))|(?:\+\+|--)\s*{escaped}\b)"
+    )
+    for statement in statements:
+        code = _mask(statement)
+        head = re.match(rf"\s*(?:let|var)\s+{escaped}\b", code)
+        if head:
+            code = code[head.end():]
+        if pattern.search(code):
+            return True
+    return False
+
+
+def declared_names(statement: str) -> list[str]:
+    """提取顶层语句声明的绑定名。"""
+    head = _strip_comments(statement)
+    head = re.sub(r"^export\s+(default\s+)?", "", head)
+    match = re.match(r"(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)", head) or re.match(
+        r"(?:abstract\s+)?class\s+([A-Za-z_$][\w$]*)", head
+    )
+    if match:
+        return [match.group(1)]
+    match = re.match(r"(?:const|let|var)\s+([A-Za-z_$][\w$]*)", head)
+    if match:
+        return [match.group(1)]
+    match = re.match(r"(?:const|let|var)\s*([{\[])", head)
+    if not match:
+        return []
+    close = "}" if match.group(1) == "{" else "]"
+    inner = head[match.end():head.find(close, match.end())]
+    names = []
+    for part in inner.split(","):
+        part = part.strip().lstrip(".")
+        if not part:
+            continue
+        if ":" in part and match.group(1) == "{":
+            part = part.split(":", 1)[1]
+        part = part.split("=", 1)[0].strip()
+        if re.fullmatch(r"[A-Za-z_$][\w$]*", part):
+            names.append(part)
+    return names
+
+
+def _indent(text: str, literal_lines: set[int], first_line: int) -> str:
+    out = []
+    for offset, line in enumerate(text.split("\n")):
+        if line and (first_line + offset) not in literal_lines:
+            out.append("  " + line)
+        else:
+            out.append(line)
+    return "\n".join(out)
+
+
+def pascal_case(stem: str) -> str:
+    return "".join(part[:1].upper() + part[1:] for part in re.split(r"[^A-Za-z0-9]+", stem) if part)
+
+
+def build_composable(code: str, stem: str, typescript: bool) -> tuple[str, str, list[str]]:
+    """把 <script setup> 内容拆为 (新的 .vue 脚本内容, 组合式函数文件内容, 警告)。
+
+    - 调用方需先用 has_top_level_await 排除含顶层 await 的脚本（见 plan_split）
+    - enum 是运行时的值，移到 xxx.ts 后按值导回 .vue，模板仍可使用
+    - 被重新赋值的顶层 let 解构后只是初始值快照，作为警告返回
+    """
+    statements, literal_lines = split_statements(code.strip("\n"))
+    fn_name = f"use{pascal_case(stem)}"
+
+    imports: list[str] = []
+    types: list[tuple[str, str]] = []
+    declaring_macros: list[tuple[str, list[str]]] = []
+    trailing_macros: list[str] = []
+    body: list[tuple[str, int]] = []
+    returns: list[str] = []
+    variables: list[str] = []
+    line = 0
+
+    for statement in statements:
+        head = _strip_comments(statement)
+        if IMPORT_RE.match(head):
+            imports.append(statement)
+        elif typescript and TYPE_DECL_RE.match(head):
+            types.append((statement, TYPE_DECL_RE.match(head).group(4)))
+        elif MACRO_RE.search(statement):
+            names = declared_names(statement)
+            if names:
+                declaring_macros.append((statement, names))
+            else:
+                trailing_macros.append(statement)
+        else:
+            body.append((statement, line))
+            names = declared_names(statement)
+            for name in names:
+                if name not in returns:
+                    returns.append(name)
+            if re.match(r"(?:let|var)\b", head):
+                variables.extend(names)
+        line += statement.count("\n")
+
+    params: list[str] = []
+    for statement, names in declaring_macros:
+        generic = re.search(r"defineProps\s*<\s*([A-Za-z_$][\w$.]*)\s*>", statement)
+        for name in names:
+            if not typescript:
+                params.append(name)
+            elif generic and len(names) == 1:
+                params.append(f"{name}: {generic.group(1)}")
+            else:
+                params.append(f"{name}: any")
+    args = ", ".join(n for _, names in declaring_macros for n in names)
+    body_texts = [s for s, _ in body]
+    warnings = [
+        f"顶层 let {name} 被重新赋值，解构后模板只能看到初始值，应改为 ref()"
+        for name in variables
+        if reassigned(name, body_texts)
+    ]
+
+    ts_parts: list[str] = []
+    if imports:
+        ts_parts.append("".join(imports).strip("\n"))
+    for statement, _ in types:
+        head = _strip_comments(statement)
+        exported = statement if head.startswith("export") else statement.replace(head, "export " + head, 1)
+        ts_parts.append(exported.strip("\n"))
+    fn_lines = [f"export function {fn_name}({', '.join(params)}) {{"]
+    for index, (statement, first) in enumerate(body):
+        fn_lines.append(_indent(statement.rstrip("\n"), literal_lines, first))
+        if statement.endswith("\n\n") and index < len(body) - 1:
+            fn_lines.append("")
+    if returns:
+        fn_lines.append("")
+        fn_lines.append("  return {")
+        fn_lines.extend(f"    {name}," for name in returns)
+        fn_lines.append("  }")
+    fn_lines.append("}")
+    ts_parts.append("\n".join(fn_lines))
+    module_text = "\n\n".join(ts_parts) + "\n"
+
+    macro_text = "".join(s for s, _ in declaring_macros) + "".join(trailing_macros)
+    enum_names = [
+        name for statement, name in types if TYPE_DECL_RE.match(_strip_comments(statement)).group(3).endswith("enum")
+    ]
+    type_names = [
+        name for _, name in types if name not in enum_names and re.search(rf"\b{re.escape(name)}\b", macro_text)
+    ]
+
+    vue_parts: list[str] = []
+    wiring = [f"import {{ {', '.join([fn_name, *enum_names])} }} from './{stem}'"]
+    if type_names:
+        wiring.append(f"import type {{ {', '.join(type_names)} }} from './{stem}'")
+    vue_parts.append(("".join(imports).strip("\n") + "\n" if imports else "") + "\n".join(wiring))
+    if declaring_macros:
+        vue_parts.append("".join(s for s, _ in declaring_macros).strip("\n"))
+    call = f"{fn_name}({args})"
+    vue_parts.append(f"const {{ {', '.join(returns)} }} = {call}" if returns else call)
+    if trailing_macros:
+        vue_parts.append("".join(trailing_macros).strip("\n"))
+    script_text = "\n\n".join(vue_parts)
+
+    return script_text, module_text, warnings
+
+
+def _style_name(block: Block, stem: str, used: set[str]) -> str:
+    ext = STYLE_EXTS.get((block.attr("lang") or "css").lower(), "css")
+    kind = ".scoped" if block.attr("scoped") is not None else ""
+    if block.attr("module") is not None:
+        kind = ".module"
+    name = f"{stem}{kind}.{ext}"
+    index = 2
+    while name in used:
+        name = f"{stem}.{index}{kind}.{ext}"
+        index += 1
+    used.add(name)
+    return name
+
+
+def plan_split(path: Path, style_dir: Path | None) -> tuple[bytes, list[tuple[Path, bytes]], list[list[str]]]:
+    """生成拆分方案，返回 (新的 .vue 内容, [(输出文件, 内容)], 报告行)。"""
+    data = path.read_bytes()
+    blocks = scan_blocks(data)
+    stem = path.stem
+    out_dir = style_dir or path.parent
+    style_prefix = os.path.relpath(out_dir, path.parent).replace(os.sep, "/")
+    style_prefix = "./" if style_prefix == "." else f"{style_prefix}/"
+    if not style_prefix.startswith("."):
+        style_prefix = "./" + style_prefix
+
+    outputs: list[tuple[Path, bytes]] = []
+    replacements: dict[int, bytes] = {}
+    report: list[list[str]] = []
+    used_styles: set[str] = set()
+    has_setup = any(b.tag == "script" and b.attr("setup") is not None for b in blocks)
+
+    for block in blocks:
+        content = data[block.content_start:block.content_end]
+        lines = block.lines(data)
+        lang = block.attr("lang")
+
+        if block.tag == "template":
+            report.append(["template", str(lines), "保留在 .vue"])
+            continue
+
+        if block.attr("src") is not None:
+            report.append([block.tag, str(lines), "已是 src 引用，跳过"])
+            continue
+
+        if block.tag == "style":
+            name = _style_name(block, stem, used_styles)
+            outputs.append((out_dir / name, content.strip(b"\r\n") + b"\n"))
+            replacements[block.start] = f"<style{block.attrs.rstrip()} src=\"{style_prefix}{name}\"></style>".encode()
+            report.append([f"style{block.attrs.rstrip()}", str(lines), f"→ {style_prefix}{name}"])
+            continue
+
+        typescript = (lang or "").lower() in ("ts", "tsx")
+        ext = "ts" if typescript else "js"
+        if block.attr("setup") is not None and has_top_level_await(content.decode("utf-8")):
+            # Vue 只在 <script setup> 自身的 await 前后恢复组件实例，移到 async 组合式函数后
+            # await 之后的 onMounted / watch / inject 都会因没有当前实例而失效
+            report.append(["script setup", str(lines), "含顶层 await，保留在 .vue（移入组合式函数会丢失组件实例）"])
+        elif block.attr("setup") is not None:
+            script_text, module_text, warnings = build_composable(content.decode("utf-8"), stem, typescript)
+            outputs.append((path.parent / f"{stem}.{ext}", module_text.encode("utf-8")))
+            replacements[block.start] = f"<script{block.attrs}>\n{script_text}\n</script>".encode("utf-8")
+            report.append(["script setup", str(lines), f"→ ./{stem}.{ext}（组合式函数 use{pascal_case(stem)}）"])
+            report.extend(["⚠ script setup", "-", warning] for warning in warnings)
+        elif has_setup:
+            report.append(["script", str(lines), "与 <script setup> 并存，保留在 .vue"])
+        else:
+            outputs.append((path.parent / f"{stem}.{ext}", content.strip(b"\r\n") + b"\n"))
+            replacements[block.start] = f"<script{block.attrs.rstrip()} src=\"./{stem}.{ext}\"></script>".encode()
+            report.append(["script", str(lines), f"→ ./{stem}.{ext}"])
+
+    parts: list[bytes] = []
+    cursor = 0
+    for block in blocks:
+        if block.start in replacements:
+            parts.append(data[cursor:block.start])
+            parts.append(replacements[block.start])
+            cursor = block.end
+    parts.append(data[cursor:])
+    return b"".join(parts), outputs, report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Vue 单文件组件拆分器")
+    parser.add_argument("file", help="要拆分的 .vue 文件")
+    parser.add_argument("--dry-run", action="store_true", help="只输出拆分方案，不写文件")
+    parser.add_argument("--force", action="store_true", help="覆盖已存在的输出文件")
+    parser.add_argument("--style-dir", help="样式文件输出目录（默认与 .vue 同目录）")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    path = Path(args.file)
+    if path.suffix != ".vue" or not path.is_file():
+        print(f"不是有效的 .vue 文件: {path}", file=sys.stderr)
+        return 1
+
+    total_lines = path.read_bytes().count(b"\n") + 1
+    new_vue, outputs, report = plan_split(path, Path(args.style_dir) if args.style_dir else None)
+
+    conflicts = [p for p, _ in outputs if p.exists()]
+    if conflicts and not args.force and not args.dry_run:
+        print("以下输出文件已存在，使用 --force 覆盖：", file=sys.stderr)
+        for conflict in conflicts:
+            print(f"  {conflict}", file=sys.stderr)
+        return 1
+
+    if not args.dry_run:
+        for target, content in outputs:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+        path.write_bytes(new_vue)
+
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"## 拆分{'方案' if args.dry_run else '结果'}：{path}（{total_lines} 行）")
+    print()
+    print("| 部分 | 行数 | 处理方式 |")
+    print("|------|------|---------|")
+    for row in report:
+        print(f"| {' | '.join(row)} |")
+    print()
+    new_lines = new_vue.count(b"\n") + 1
+    print(f"- {path.name}：{total_lines} 行 → {new_lines} 行")
+    for target, content in outputs:
+        out_lines = content.count(b"\n")
+        print(f"- {target}：{out_lines} 行")
+    print(f"- 耗时：{elapsed:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
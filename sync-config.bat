@@ -16,13 +16,57 @@ set "SYNC_DIRS=.claude .gemini"
 REM 全局覆盖策略（空表示每次询问，yes表示全部覆盖，no表示全部跳过）
 set "OVERWRITE_ALL="
 
+REM 运行时历史维护子命令，直接交给 Python 脚本处理
+if /i "%~1"=="history" (
+    python "%SCRIPT_DIR%\.claude\scripts\history_maint.py" --claude-dir "%HOME_DIR%\.claude" %2 %3 %4 %5 %6 %7 %8 %9
+    exit /b
+)
+
+REM 同步模式（full 表示逐文件确认，incremental 表示基于哈希清单的增量同步）
+set "SYNC_MODE=full"
+
+REM 同步后是否将 npx 启动的 MCP 服务固定版本并安装到 ~/.gemini/mcp
+set "PIN_MCP=false"
+
+for %%a in (%*) do (
+    if /i "%%~a"=="-i" set "SYNC_MODE=incremental"
+    if /i "%%~a"=="/i" set "SYNC_MODE=incremental"
+    if /i "%%~a"=="--incremental" set "SYNC_MODE=incremental"
+    if /i "%%~a"=="-p" set "PIN_MCP=true"
+    if /i "%%~a"=="/p" set "PIN_MCP=true"
+    if /i "%%~a"=="--pin-mcp" set "PIN_MCP=true"
+)
+
+REM 部署清单文件名（位于 ~/.claude、~/.gemini 根目录，格式：源哈希 部署哈希 相对路径）
+set "MANIFEST_NAME=.sync-manifest"
+
+REM 增量同步统计
+set /a STAT_SCANNED=0
+set /a STAT_COPIED=0
+set /a STAT_SKIPPED=0
+set /a STAT_KEPT=0
+set /a STAT_BYTES=0
+
 echo === 配置同步工具 ===
 echo 源目录: %SCRIPT_DIR%
 echo 目标目录: %HOME_DIR%
 echo.
 
-for %%d in (%SYNC_DIRS%) do (
-    call :sync_directory "%%d"
+if "%SYNC_MODE%"=="incremental" (
+    call :now_cs START_CS
+    for %%d in (%SYNC_DIRS%) do (
+        call :sync_directory_incremental "%%d"
+    )
+    call :now_cs END_CS
+    call :print_sync_report
+) else (
+    for %%d in (%SYNC_DIRS%) do (
+        call :sync_directory "%%d"
+    )
+)
+
+if "%PIN_MCP%"=="true" (
+    call :pin_mcp_servers
 )
 
 echo.
@@ -119,3 +163,166 @@ goto :eof
 
     REM 默认不覆盖（空输入或其他输入）
     exit /b 1
+
+:sync_directory_incremental
+    set "dir_name=%~1"
+    set "src_dir=%SCRIPT_DIR%\%dir_name%"
+    set "dest_dir=%HOME_DIR%\%dir_name%"
+    set "manifest=%dest_dir%\%MANIFEST_NAME%"
+    set "new_manifest=%dest_dir%\%MANIFEST_NAME%.tmp"
+
+    if not exist "%src_dir%" (
+        echo [警告] 源目录不存在，跳过: %src_dir%
+        goto :eof
+    )
+
+    echo.
+    echo [开始增量同步] %dir_name%
+
+    if not exist "%dest_dir%" (
+        mkdir "%dest_dir%"
+    )
+
+    REM 清空上一个目录的清单映射，再加载本目录清单（MS_ 为源哈希，MD_ 为部署哈希）
+    for /f "delims==" %%v in ('set MS_ 2^>nul') do set "%%v="
+    for /f "delims==" %%v in ('set MD_ 2^>nul') do set "%%v="
+    if exist "%manifest%" (
+        for /f "usebackq tokens=1,2,*" %%a in ("%manifest%") do (
+            set "MS_%%c=%%a"
+            set "MD_%%c=%%b"
+        )
+    )
+
+    type nul > "%new_manifest%"
+
+    for /r "%src_dir%" %%f in (*) do (
+        set "file=%%f"
+        set "rel_path=!file:%src_dir%\=!"
+        if /i not "%%~nxf"=="%MANIFEST_NAME%" (
+            call :sync_file_incremental "%%f" "!rel_path!"
+        )
+    )
+
+    move /y "%new_manifest%" "%manifest%" >nul
+    goto :eof
+
+:sync_file_incremental
+    set "src_file=%~1"
+    set "rel_path=%~2"
+    set "dest_file=%dest_dir%\%rel_path%"
+    set /a STAT_SCANNED+=1
+
+    call :hash_file src_hash "%src_file%"
+    set "dest_hash=-"
+    if exist "%dest_file%" (
+        call :hash_file dest_hash "%dest_file%"
+    )
+    set "m_src=!MS_%rel_path%!"
+    set "m_dest=!MD_%rel_path%!"
+
+    REM 分类：copy 直接复制 / skip 内容一致 / keep 保留本地修改 / ask 需要确认
+    set "action=ask"
+    if "!dest_hash!"=="-" (
+        set "action=copy"
+    ) else if "!dest_hash!"=="!src_hash!" (
+        set "action=skip"
+    ) else if not defined m_dest (
+        set "action=ask"
+    ) else if not "!dest_hash!"=="!m_dest!" (
+        set "action=ask"
+    ) else if "!m_dest!"=="!m_src!" (
+        set "action=copy"
+    ) else if "!src_hash!"=="!m_src!" (
+        set "action=keep"
+    )
+
+    if "!action!"=="ask" (
+        call :confirm_overwrite "!dest_file!" "!src_file!"
+        if errorlevel 1 (
+            set "action=keep"
+            echo [×] 已跳过: !dest_file!
+        ) else (
+            set "action=copy"
+        )
+    )
+
+    if "!action!"=="copy" (
+        for %%p in ("!dest_file!") do (
+            if not exist "%%~dpp" mkdir "%%~dpp"
+        )
+        copy /y "!src_file!" "!dest_file!" >nul
+        for %%s in ("!src_file!") do set /a STAT_BYTES+=%%~zs
+        set /a STAT_COPIED+=1
+        echo [√] 已同步: !dest_file!
+        >>"%new_manifest%" echo !src_hash! !src_hash! !rel_path!
+    )
+    if "!action!"=="skip" (
+        set /a STAT_SKIPPED+=1
+        >>"%new_manifest%" echo !src_hash! !src_hash! !rel_path!
+    )
+    if "!action!"=="keep" (
+        set /a STAT_KEPT+=1
+        >>"%new_manifest%" echo !src_hash! !dest_hash! !rel_path!
+    )
+    goto :eof
+
+:hash_file
+    REM 计算 SHA256（certutil 输出中只有哈希行不含冒号）
+    set "%~1="
+    for /f "delims=" %%h in ('certutil -hashfile "%~2" SHA256 2^>nul ^| findstr /v ":"') do (
+        if not defined %~1 set "%~1=%%h"
+    )
+    if defined %~1 set "%~1=!%~1: =!"
+    goto :eof
+
+:now_cs
+    REM 当前时间（百分之一秒）
+    set "now=%time: =0%"
+    set /a "%~1=((1%now:~0,2%-100)*3600+(1%now:~3,2%-100)*60+(1%now:~6,2%-100))*100+(1%now:~9,2%-100)"
+    goto :eof
+
+:print_sync_report
+    set /a "ELAPSED_CS=END_CS-START_CS"
+    if %ELAPSED_CS% lss 0 set /a "ELAPSED_CS+=8640000"
+    set /a "ELAPSED_MS=ELAPSED_CS*10"
+
+    echo.
+    echo === 同步报告 ===
+    echo 扫描文件: %STAT_SCANNED%
+    echo 复制文件: %STAT_COPIED%
+    echo 内容一致跳过: %STAT_SKIPPED%
+    echo 保留本地修改: %STAT_KEPT%
+    echo 复制字节: %STAT_BYTES%
+    echo 耗时: %ELAPSED_MS% ms
+    goto :eof
+
+:pin_mcp_servers
+    REM 固定 MCP 服务版本，并把已部署的 settings.json 改为启动本地安装的入口
+    set "settings=%HOME_DIR%\.gemini\settings.json"
+    set "manifest=%HOME_DIR%\.gemini\%MANIFEST_NAME%"
+
+    echo.
+    echo [固定 MCP 服务版本]
+
+    if not exist "!settings!" (
+        echo [警告] 未找到已部署的配置，跳过: !settings!
+        goto :eof
+    )
+
+    python "%SCRIPT_DIR%\.gemini\scripts\mcp_pin.py" --settings "!settings!" install
+    if errorlevel 1 goto :eof
+
+    REM 改写后的 settings.json 记入部署清单，后续增量同步视为已知状态而非本地修改
+    if exist "!manifest!" (
+        call :hash_file new_hash "!settings!"
+        type nul > "!manifest!.tmp"
+        for /f "usebackq tokens=1,2,*" %%a in ("!manifest!") do (
+            if /i "%%c"=="settings.json" (
+                >>"!manifest!.tmp" echo %%a !new_hash! %%c
+            ) else (
+                >>"!manifest!.tmp" echo %%a %%b %%c
+            )
+        )
+        move /y "!manifest!.tmp" "!manifest!" >nul
+    )
+    goto :eof
@@ -21,6 +21,22 @@ SYNC_DIRS=(".claude" ".gemini")
 # 全局覆盖策略（空表示每次询问，yes表示全部覆盖，no表示全部跳过）
 OVERWRITE_ALL=""
 
+# 同步模式（full 表示逐文件确认，incremental 表示基于哈希清单的增量同步）
+SYNC_MODE="full"
+
+# 部署清单文件名（位于 ~/.claude、~/.gemini 根目录，格式：源哈希<TAB>部署哈希<TAB>相对路径）
+MANIFEST_NAME=".sync-manifest"
+
+# 同步后是否将 npx 启动的 MCP 服务固定版本并安装到 ~/.gemini/mcp
+PIN_MCP="false"
+
+# 增量同步统计
+STAT_SCANNED=0
+STAT_COPIED=0
+STAT_SKIPPED=0
+STAT_KEPT=0
+STAT_BYTES=0
+
 # 确认覆盖函数
 confirm_overwrite() {
     local file="${1}"
@@ -105,17 +121,259 @@ sync_directory() {
     done < <(find "${src_dir}" -type f -print0)
 }
 
+# 当前时间（毫秒）
+now_ms() {
+    if [[ -n "${EPOCHREALTIME:-}" ]]; then
+        local sec="${EPOCHREALTIME%.*}"
+        local usec="${EPOCHREALTIME#*.}"
+        echo $(( sec * 1000 + 10#${usec:0:3} ))
+    else
+        echo $(( $(date +%s) * 1000 ))
+    fi
+}
+
+# 批量计算文件哈希（从标准输入读取 NUL 分隔的相对路径，输出"哈希  路径"）
+hash_files() {
+    if command -v sha256sum > /dev/null 2>&1; then
+        xargs -0 sha256sum 2> /dev/null || true
+    else
+        xargs -0 shasum -a 256 2> /dev/null || true
+    fi
+}
+
+# 对比源哈希、部署哈希与清单，为每个文件分类
+# 输出：动作<TAB>源哈希<TAB>部署哈希<TAB>相对路径
+# 动作：copy 直接复制 / skip 内容一致 / keep 保留本地修改 / ask 需要确认
+classify_files() {
+    local manifest="${1}"
+    local src_hashes="${2}"
+    local dest_hashes="${3}"
+
+    awk -F '\t' '
+        FILENAME == ARGV[1] {
+            m_src[$3] = $1
+            m_dest[$3] = $2
+            next
+        }
+        FILENAME == ARGV[2] {
+            dest[substr($0, 67)] = substr($0, 1, 64)
+            next
+        }
+        {
+            path = substr($0, 67)
+            src = substr($0, 1, 64)
+            cur = (path in dest) ? dest[path] : "-"
+
+            if (cur == "-") {
+                action = "copy"
+            } else if (cur == src) {
+                action = "skip"
+            } else if (!(path in m_dest)) {
+                action = "ask"
+            } else if (cur != m_dest[path]) {
+                action = "ask"
+            } else if (m_dest[path] == m_src[path]) {
+                action = "copy"
+            } else if (src == m_src[path]) {
+                action = "keep"
+            } else {
+                action = "ask"
+            }
+            printf "%s\t%s\t%s\t%s\n", action, src, cur, path
+        }
+    ' "${manifest}" "${dest_hashes}" "${src_hashes}"
+}
+
+# 增量同步目录函数
+sync_directory_incremental() {
+    local dir_name="${1}"
+    local src_dir="${SCRIPT_DIR}/${dir_name}"
+    local dest_dir="${HOME_DIR}/${dir_name}"
+    local manifest="${dest_dir}/${MANIFEST_NAME}"
+
+    if [[ ! -d "${src_dir}" ]]; then
+        echo -e "${YELLOW}源目录不存在，跳过: ${src_dir}${NC}"
+        return
+    fi
+
+    echo -e "\n${GREEN}开始增量同步: ${dir_name}${NC}"
+
+    mkdir -p "${dest_dir}"
+
+    local work_dir
+    work_dir="$(mktemp -d)"
+
+    # 一次性收集源文件列表并批量计算哈希
+    (cd "${src_dir}" && find . -type f ! -name "${MANIFEST_NAME}" -print0) > "${work_dir}/files"
+    (cd "${src_dir}" && hash_files < "${work_dir}/files") > "${work_dir}/src"
+    (cd "${dest_dir}" && hash_files < "${work_dir}/files") > "${work_dir}/dest"
+
+    if [[ -f "${manifest}" ]]; then
+        cp "${manifest}" "${work_dir}/manifest"
+    else
+        : > "${work_dir}/manifest"
+    fi
+
+    classify_files "${work_dir}/manifest" "${work_dir}/src" "${work_dir}/dest" > "${work_dir}/plan"
+
+    : > "${work_dir}/copy"
+    : > "${work_dir}/new_manifest"
+
+    local action src_hash dest_hash rel_path
+    while IFS=$'\t' read -r action src_hash dest_hash rel_path; do
+        STAT_SCANNED=$(( STAT_SCANNED + 1 ))
+
+        if [[ "${action}" == "ask" ]]; then
+            if confirm_overwrite "${dest_dir}/${rel_path#./}"; then
+                action="copy"
+            else
+                action="keep"
+                echo -e "${YELLOW}✗ 已跳过: ${dest_dir}/${rel_path#./}${NC}"
+            fi
+        fi
+
+        case "${action}" in
+            copy)
+                STAT_COPIED=$(( STAT_COPIED + 1 ))
+                printf '%s\0' "${rel_path}" >> "${work_dir}/copy"
+                printf '%s\t%s\t%s\n' "${src_hash}" "${src_hash}" "${rel_path}" >> "${work_dir}/new_manifest"
+                ;;
+            skip)
+                STAT_SKIPPED=$(( STAT_SKIPPED + 1 ))
+                printf '%s\t%s\t%s\n' "${src_hash}" "${src_hash}" "${rel_path}" >> "${work_dir}/new_manifest"
+                ;;
+            keep)
+                STAT_KEPT=$(( STAT_KEPT + 1 ))
+                printf '%s\t%s\t%s\n' "${src_hash}" "${dest_hash}" "${rel_path}" >> "${work_dir}/new_manifest"
+                ;;
+        esac
+    done < "${work_dir}/plan"
+
+    # 单次 tar 管道批量复制所有变更文件
+    if [[ -s "${work_dir}/copy" ]]; then
+        local bytes
+        bytes="$(cd "${src_dir}" && xargs -0 wc -c < "${work_dir}/copy" | awk '$2 != "total" { s += $1 } END { print s + 0 }')"
+        STAT_BYTES=$(( STAT_BYTES + bytes ))
+
+        (cd "${src_dir}" && tar -cf - --null -T "${work_dir}/copy") | (cd "${dest_dir}" && tar -xf -)
+
+        tr '\0' '\n' < "${work_dir}/copy" | while IFS= read -r rel_path; do
+            echo -e "${GREEN}✓ 已同步: ${dest_dir}/${rel_path#./}${NC}"
+        done
+    fi
+
+    mv "${work_dir}/new_manifest" "${manifest}"
+    rm -rf "${work_dir}"
+}
+
+# 输出增量同步报告
+print_sync_report() {
+    local elapsed="${1}"
+
+    echo -e "\n${GREEN}=== 同步报告 ===${NC}"
+    echo -e "扫描文件: ${STAT_SCANNED}"
+    echo -e "复制文件: ${STAT_COPIED}"
+    echo -e "内容一致跳过: ${STAT_SKIPPED}"
+    echo -e "保留本地修改: ${STAT_KEPT}"
+    echo -e "复制字节: ${STAT_BYTES}"
+    echo -e "耗时: ${elapsed} ms"
+}
+
+# 固定 MCP 服务版本，并把已部署的 settings.json 改为启动本地安装的入口
+pin_mcp_servers() {
+    local settings="${HOME_DIR}/.gemini/settings.json"
+    local manifest="${HOME_DIR}/.gemini/${MANIFEST_NAME}"
+
+    echo -e "\n${GREEN}固定 MCP 服务版本${NC}"
+
+    if [[ ! -f "${settings}" ]]; then
+        echo -e "${YELLOW}未找到已部署的配置，跳过: ${settings}${NC}"
+        return
+    fi
+
+    python3 "${SCRIPT_DIR}/.gemini/scripts/mcp_pin.py" --settings "${settings}" install
+
+    # 改写后的 settings.json 记入部署清单，后续增量同步视为已知状态而非本地修改
+    if [[ -f "${manifest}" ]]; then
+        local new_hash
+        new_hash="$(cd "${HOME_DIR}/.gemini" && printf '%s\0' "./settings.json" | hash_files | awk '{ print $1 }')"
+        awk -v h="${new_hash}" 'BEGIN { FS = OFS = "\t" } $3 == "./settings.json" { $2 = h } { print }' \
+            "${manifest}" > "${manifest}.tmp" && mv "${manifest}.tmp" "${manifest}"
+    fi
+}
+
+# 使用说明
+usage() {
+    echo "用法: $(basename "${0}") [选项]"
+    echo "      $(basename "${0}") history <compact|query|bench> [参数]"
+    echo ""
+    echo "选项:"
+    echo "  -i, --incremental  增量同步：仅复制变更文件，仅对本地修改过的文件询问"
+    echo "  -p, --pin-mcp      同步后固定 MCP 服务版本并安装到 ~/.gemini/mcp，不再每次通过 npx 下载"
+    echo "  -h, --help         显示帮助"
+    echo ""
+    echo "子命令:"
+    echo "  history            维护 ~/.claude/history.jsonl（轮转压缩、去重、按项目索引），详见 history -h"
+}
+
+# 解析参数
+parse_args() {
+    while [[ $# -gt 0 ]]; do
+        case "${1}" in
+            -i|--incremental)
+                SYNC_MODE="incremental"
+                ;;
+            -p|--pin-mcp)
+                PIN_MCP="true"
+                ;;
+            -h|--help)
+                usage
+                exit 0
+                ;;
+            *)
+                echo -e "${RED}未知参数: ${1}${NC}"
+                usage
+                exit 1
+                ;;
+        esac
+        shift
+    done
+}
+
 # 主流程
 main() {
+    # 运行时历史维护子命令，直接交给 Python 脚本处理
+    if [[ "${1:-}" == "history" ]]; then
+        shift
+        exec python3 "${SCRIPT_DIR}/.claude/scripts/history_maint.py" --claude-dir "${HOME_DIR}/.claude" "$@"
+    fi
+
+    parse_args "$@"
+
     echo -e "${GREEN}=== 配置同步工具 ===${NC}"
     echo -e "源目录: ${SCRIPT_DIR}"
     echo -e "目标目录: ${HOME_DIR}"
 
-    for dir in "${SYNC_DIRS[@]}"; do
-        sync_directory "${dir}"
-    done
+    if [[ "${SYNC_MODE}" == "incremental" ]]; then
+        local start_ms
+        start_ms="$(now_ms)"
+
+        for dir in "${SYNC_DIRS[@]}"; do
+            sync_directory_incremental "${dir}"
+        done
+
+        print_sync_report "$(( $(now_ms) - start_ms ))"
+    else
+        for dir in "${SYNC_DIRS[@]}"; do
+            sync_directory "${dir}"
+        done
+    fi
+
+    if [[ "${PIN_MCP}" == "true" ]]; then
+        pin_mcp_servers
+    fi
 
     echo -e "\n${GREEN}=== 同步完成 ===${NC}"
 }
 
-main
+main "$@"
@@ -0,0 +1,71 @@
+"""collect_source.py 去注释规则的测试：注释符号出现在代码中时不得截断代码。"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / ".claude" / "templates" / "ruanzhu"))
+
+from collect_source import clean_lines  # noqa: E402
+
+
+def lines_of(tmp_path: Path, name: str, text: str) -> list[str]:
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return clean_lines(str(path))
+
+
+def test_shell_hash_inside_word_is_code(tmp_path):
+    assert lines_of(
+        tmp_path,
+        "run.sh",
+        "#!/bin/bash\n# 统计\necho ${#arr[@]}  # 元素个数\necho $# 'a # b'\nurl=http://x/#top\n",
+    ) == ["echo ${#arr[@]}", "echo $# 'a # b'", "url=http://x/#top"]
+
+
+def test_js_regex_literal_is_code(tmp_path):
+    assert lines_of(
+        tmp_path,
+        "util.js",
+        "const re = /\\/\\//g; // 双斜杠\n"
+        "const parts = path.split(/\\/*/)\n"
+        "function isUrl(s) {\n  return /^https?:\\/\\//.test(s) /* 协议 */\n}\n"
+        "const half = total / 2 // 除号\n",
+    ) == [
+        "const re = /\\/\\//g;",
+        "const parts = path.split(/\\/*/)",
+        "function isUrl(s) {",
+        "  return /^https?:\\/\\//.test(s)",
+        "}",
+        "const half = total / 2",
+    ]
+
+
+def test_markup_text_keeps_double_slash(tmp_path):
+    assert lines_of(
+        tmp_path,
+        "App.vue",
+        "<template>\n  <!-- 链接 -->\n  <a href=\"http://example.com\">见 http://example.com/*</a>\n</template>\n"
+        "<script setup>\nconst home = 'http://example.com' // 首页\nconst re = /\\/\\//\n</script>\n"
+        "<style scoped>\n/* 颜色 */\na { color: red; }\n</style>\n",
+    ) == [
+        "<template>",
+        "  <a href=\"http://example.com\">见 http://example.com/*</a>",
+        "</template>",
+        "<script setup>",
+        "const home = 'http://example.com'",
+        "const re = /\\/\\//",
+        "</script>",
+        "<style scoped>",
+        "a { color: red; }",
+        "</style>",
+    ]
+
+
+def test_c_style_and_python_comments_are_removed(tmp_path):
+    assert lines_of(tmp_path, "main.go", "// 包\npackage main\n/* 多行\n注释 */\nvar s = \"//x\"\n") == [
+        "package main",
+        "var s = \"//x\"",
+    ]
+    assert lines_of(tmp_path, "app.py", "x = '#'  # 注释\n# 整行\n") == ["x = '#'"]
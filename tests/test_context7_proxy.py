@@ -0,0 +1,98 @@
+"""context7_proxy.py 的请求头转发和 SSE 响应解析测试（使用本地模拟上游）。"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / ".gemini" / "scripts"))
+
+from context7_proxy import DocCache, Proxy, ProxyServer  # noqa: E402
+
+
+class LowercaseUpstream(BaseHTTPRequestHandler):
+    """记录收到的请求头，并以小写头名返回 SSE 响应，模拟 fetch 类服务端。"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        message = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+        self.server.received.append(dict(self.headers))
+        result = {"content": [{"type": "text", "text": "docs"}]} if message.get("method") == "tools/call" else {}
+        payload = json.dumps({"jsonrpc": "2.0", "id": message.get("id"), "result": result})
+        body = f"event: message\ndata: {payload}\n\n".encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("mcp-session-id", "upstream-session")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def proxy_port(tmp_path):
+    upstream = ThreadingHTTPServer(("127.0.0.1", 0), LowercaseUpstream)
+    upstream.received = []
+    cache = DocCache(tmp_path, 3600, 1024 * 1024)
+    proxy = ProxyServer(("127.0.0.1", 0), Proxy(f"http://127.0.0.1:{upstream.server_port}/mcp", cache))
+    for server in (upstream, proxy):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield proxy.server_port, upstream.received
+    proxy.shutdown()
+    upstream.shutdown()
+
+
+def post(port: int, message: dict) -> tuple[int, dict, bytes]:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request(
+        "POST",
+        "/mcp",
+        body=json.dumps(message),
+        headers={
+            "content-type": "application/json",
+            "accept": "application/json, text/event-stream",
+            "mcp-session-id": "client-session",
+        },
+    )
+    response = conn.getresponse()
+    result = response.status, {k.lower(): v for k, v in response.getheaders()}, response.read()
+    conn.close()
+    return result
+
+
+def test_lowercase_request_headers_are_forwarded(proxy_port):
+    port, received = proxy_port
+    status, headers, _ = post(port, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+    assert status == 200
+    upstream_headers = {k.lower(): v for k, v in received[0].items()}
+    assert upstream_headers["content-type"] == "application/json"
+    assert upstream_headers["accept"] == "application/json, text/event-stream"
+    assert upstream_headers["mcp-session-id"] == "client-session"
+    assert headers["mcp-session-id"] == "upstream-session"
+
+
+def test_sse_reply_with_lowercase_content_type_is_cached(proxy_port):
+    port, received = proxy_port
+    message = {
+        "jsonrpc": "2.0",
+        "id": 7,
+        "method": "tools/call",
+        "params": {"name": "get-library-docs", "arguments": {"context7CompatibleLibraryID": "/vuejs/core"}},
+    }
+    states = []
+    for _ in range(2):
+        status, headers, body = post(port, message)
+        assert status == 200
+        assert json.loads(body)["result"]["content"][0]["text"] == "docs"
+        states.append(headers["x-cache"])
+    assert states == ["MISS", "HIT"]
+    assert len(received) == 1
@@ -0,0 +1,121 @@
+"""history_maint.py compact 的并发追加和中断恢复测试。"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / ".claude" / "scripts"))
+
+import history_maint  # noqa: E402
+from history_maint import HISTORY_FILE, compact, query  # noqa: E402
+
+NOW = int(time.time() * 1000)
+DAY = 86400 * 1000
+
+
+class Crash(Exception):
+    pass
+
+
+def record(display: str, ts: int) -> str:
+    return json.dumps({"display": display, "timestamp": ts, "project": "/p"}) + "\n"
+
+
+def write_history(claude_dir: Path) -> set[str]:
+    """20 条旧记录（会被归档）+ 20 条新记录（保留），外加一条相邻重复。"""
+    lines = [record(f"old-{i}", NOW - (100 + i) * DAY) for i in range(20)]
+    lines += [record(f"new-{i}", NOW - i * 1000) for i in range(20)]
+    (claude_dir / HISTORY_FILE).write_text("".join(lines) + lines[-1], encoding="utf-8")
+    return set(lines)
+
+
+def all_records(claude_dir: Path, keep_days: int = 30) -> list[str]:
+    """归档段 + history.jsonl 中的全部记录（保留重复，用于检查重复归档 / 合并）。"""
+    # 结束时间不晚于 compact 的 cutoff，查询只读压缩段，不会再扫一遍 history.jsonl
+    archived = [line.decode("utf-8") for line in query(claude_dir, "/p", None, NOW - keep_days * DAY + 1)]
+    live = (claude_dir / HISTORY_FILE).read_text(encoding="utf-8").splitlines(keepends=True)
+    return archived + live
+
+
+def test_appends_during_compact_are_kept(tmp_path, monkeypatch):
+    expected = write_history(tmp_path)
+    late = record("late", NOW)
+    archive_aside = history_maint._archive_aside
+
+    def append_while_archiving(*args, **kwargs):
+        with open(tmp_path / HISTORY_FILE, "a", encoding="utf-8") as f:
+            f.write(late)
+        return archive_aside(*args, **kwargs)
+
+    monkeypatch.setattr(history_maint, "_archive_aside", append_while_archiving)
+    stats = compact(tmp_path, 30)
+    assert stats["archived"] == 20 and stats["duplicates"] == 1
+    assert sorted(all_records(tmp_path)) == sorted(expected | {late})
+    assert sorted(os.listdir(tmp_path)) == ["history", HISTORY_FILE]
+
+
+# 按调用顺序覆盖 compact 的每个落盘步骤
+STEPS = [
+    ("os", "replace"),
+    ("os", "unlink"),
+    ("os", "fsync"),
+    (None, "save_index"),
+    (None, "_copy_from"),
+]
+
+
+def test_crash_at_every_step_resumes_without_loss_or_duplicates(tmp_path, monkeypatch):
+    crash_at = 1
+    while True:
+        claude_dir = tmp_path / f"run-{crash_at}"
+        claude_dir.mkdir()
+        expected = write_history(claude_dir)
+        calls = 0
+
+        with monkeypatch.context() as patch:
+            for module, name in STEPS:
+                target = getattr(history_maint, module) if module else history_maint
+                original = getattr(target, name)
+
+                def wrapper(*args, _original=original, **kwargs):
+                    nonlocal calls
+                    calls += 1
+                    if calls == crash_at:
+                        raise Crash
+                    return _original(*args, **kwargs)
+
+                patch.setattr(target, name, wrapper)
+            try:
+                compact(claude_dir, 30)
+                crashed = False
+            except Crash:
+                crashed = True
+
+        if crashed:
+            compact(claude_dir, 30)
+        records = all_records(claude_dir)
+        assert sorted(records) == sorted(expected), f"第 {crash_at} 步中断后恢复结果不一致"
+        assert sorted(os.listdir(claude_dir)) == ["history", HISTORY_FILE]
+        if not crashed:
+            break
+        crash_at += 1
+    assert crash_at > 5
+
+
+def test_compact_without_history_is_noop(tmp_path):
+    assert compact(tmp_path, 30)["lines"] == 0
+    assert not (tmp_path / HISTORY_FILE).exists()
+
+
+@pytest.mark.parametrize("keep_days", [0, 365])
+def test_compact_twice_is_stable(tmp_path, keep_days):
+    expected = write_history(tmp_path)
+    compact(tmp_path, keep_days)
+    compact(tmp_path, keep_days)
+    assert sorted(all_records(tmp_path, keep_days)) == sorted(expected)
@@ -0,0 +1,64 @@
+"""mcp_pin.py 固定版本和 --update 重新解析的测试（npm 调用以桩替代）。"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / ".gemini" / "scripts"))
+
+import mcp_pin  # noqa: E402
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """模拟 npm：resolve_version 返回 versions 中的当前版本，install_package 只创建目录。"""
+    mcp_dir = tmp_path / "mcp"
+    versions = {"@modelcontextprotocol/server-sequential-thinking": "1.0.0"}
+    monkeypatch.setattr(mcp_pin, "MCP_DIR", mcp_dir)
+    monkeypatch.setattr(mcp_pin, "PINS_FILE", mcp_dir / "pins.json")
+    monkeypatch.setattr(mcp_pin, "SOURCES_FILE", mcp_dir / "sources.json")
+    monkeypatch.setattr(mcp_pin, "resolve_version", lambda name, version_range: versions[name])
+    monkeypatch.setattr(mcp_pin, "install_package", lambda name, version: mcp_pin.install_dir(name, version))
+    monkeypatch.setattr(mcp_pin, "entry_point", lambda target, name: target / "dist" / "index.js")
+    monkeypatch.setattr(mcp_pin.shutil, "which", lambda command: f"/usr/bin/{command}")
+    return versions
+
+
+def write_settings(path: Path) -> None:
+    server = {"command": "npx", "args": ["-y", "@modelcontextprotocol/server-sequential-thinking", "--flag"], "env": {"A": "1"}}
+    path.write_text(json.dumps({"mcpServers": {"thinking": server, "remote": {"httpUrl": "http://x"}}}), encoding="utf-8")
+
+
+def install(settings: Path, *extra: str) -> dict:
+    assert mcp_pin.main(["--settings", str(settings), "install", *extra]) == 0
+    return json.loads(settings.read_text(encoding="utf-8"))["mcpServers"]
+
+
+def test_install_rewrites_npx_entry(tmp_path, registry):
+    settings = tmp_path / "settings.json"
+    write_settings(settings)
+    servers = install(settings)
+    assert servers["thinking"]["command"] == "/usr/bin/node"
+    assert servers["thinking"]["args"][0].endswith("server-sequential-thinking@1.0.0/dist/index.js")
+    assert servers["thinking"]["args"][1:] == ["--flag"]
+    assert servers["thinking"]["env"] == {"A": "1"}
+    assert servers["remote"] == {"httpUrl": "http://x"}
+
+
+def test_update_re_resolves_already_pinned_entry(tmp_path, registry, capsys):
+    settings = tmp_path / "settings.json"
+    write_settings(settings)
+    install(settings)
+
+    registry["@modelcontextprotocol/server-sequential-thinking"] = "1.1.0"
+    servers = install(settings)
+    assert "@1.0.0/" in servers["thinking"]["args"][0]
+
+    servers = install(settings, "--update")
+    assert "@1.1.0/" in servers["thinking"]["args"][0]
+    assert servers["thinking"]["args"][1:] == ["--flag"]
+    assert "没有需要固定" not in capsys.readouterr().out
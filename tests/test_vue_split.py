@@ -0,0 +1,109 @@
+"""vue_split.py 中 <script setup> → 组合式函数转换的回归测试。"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / ".gemini" / "scripts"))
+
+from vue_split import build_composable, has_top_level_await, plan_split  # noqa: E402
+
+
+def split(code: str, typescript: bool = True) -> tuple[str, str, list[str]]:
+    return build_composable(code, "ListPage", typescript)
+
+
+def test_await_inside_function_keeps_composable_sync():
+    assert not has_top_level_await(
+        "const rows = ref([])\nasync function load() {\n  rows.value = await fetchRows()\n}\n"
+        "onMounted(async () => {\n  await load()\n})\n"
+    )
+    script, module, _ = split(
+        "import { ref, onMounted } from 'vue'\n"
+        "const rows = ref([])\n"
+        "async function load() {\n"
+        "  rows.value = await fetchRows()\n"
+        "}\n"
+        "onMounted(async () => {\n"
+        "  await load()\n"
+        "})\n"
+    )
+    assert "export function useListPage()" in module
+    assert "await useListPage" not in script
+
+
+def test_top_level_await_keeps_script_setup_in_vue(tmp_path):
+    vue = tmp_path / "Config.vue"
+    original = (
+        "<template>\n  <div>{{ config }}</div>\n</template>\n\n"
+        "<script setup>\nimport { onMounted } from 'vue'\n"
+        "const config = await fetchConfig()\nonMounted(() => track(config))\n</script>\n\n"
+        "<style scoped>\ndiv { color: red; }\n</style>\n"
+    )
+    vue.write_text(original, encoding="utf-8")
+    new_vue, outputs, report = plan_split(vue, None)
+    assert [path.name for path, _ in outputs] == ["Config.scoped.css"]
+    assert b"const config = await fetchConfig()\nonMounted(() => track(config))" in new_vue
+    assert any(row[0] == "script setup" and "await" in row[2] for row in report)
+
+
+def test_await_in_string_or_comment_is_ignored():
+    assert not has_top_level_await("// await later\nconst label = 'await'\n")
+    assert has_top_level_await("const config = await loadConfig()\n")
+
+
+def test_enum_is_exported_and_imported_as_value():
+    script, module, _ = split(
+        "enum Status {\n  Active = 'active',\n}\n"
+        "const enum Mode {\n  Edit,\n}\n"
+        "interface Row {\n  id: number\n}\n"
+        "const status = Status.Active\n"
+    )
+    assert "export enum Status" in module
+    assert "export const enum Mode" in module
+    assert "import { useListPage, Status, Mode } from './ListPage'" in script
+    assert "import type" not in script
+
+
+def test_type_used_by_macro_is_imported_as_type():
+    script, _, _ = split("interface Props {\n  title: string\n}\nconst props = defineProps<Props>()\n")
+    assert "import type { Props } from './ListPage'" in script
+    assert "useListPage(props)" in script
+
+
+def test_reassigned_let_is_reported():
+    _, _, warnings = split(
+        "let count = 0\n"
+        "let total = 0\n"
+        "let label = 'x'\n"
+        "let ready = false\n"
+        "function inc() {\n"
+        "  count++\n"
+        "  total += 1\n"
+        "}\n"
+        "const same = label === 'x'\n"
+        "const done = () => (ready = true)\n"
+    )
+    assert len(warnings) == 3
+    assert any("count" in w for w in warnings)
+    assert any("total" in w for w in warnings)
+    assert any("ready" in w for w in warnings)
+    assert not any("label" in w for w in warnings)
+
+
+def test_const_binding_is_not_reported():
+    _, _, warnings = split("const count = ref(0)\nfunction inc() {\n  count.value++\n}\n")
+    assert warnings == []
+
+
+def test_plan_split_adds_warning_row(tmp_path):
+    vue = tmp_path / "Counter.vue"
+    vue.write_text(
+        "<template>\n  <button @click=\"inc\">{{ count }}</button>\n</template>\n\n"
+        "<script setup>\nlet count = 0\nfunction inc() {\n  count++\n}\n</script>\n",
+        encoding="utf-8",
+    )
+    _, outputs, report = plan_split(vue, None)
+    assert [path.name for path, _ in outputs] == ["Counter.js"]
+    assert any(row[0].startswith("⚠") and "count" in row[2] for row in report)